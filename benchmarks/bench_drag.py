@@ -0,0 +1,119 @@
+# Synthetic <B1-Motion> storm: geometry calls per second, old vs coalesced drag.
+#
+#   python benchmarks/bench_drag.py [--rate 1000] [--seconds 2]
+#
+# Runs on virtual time with a fake root, so no display is needed.
+import argparse
+import heapq
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from time_overlay import DRAG_FRAME_MS, DragController  # noqa: E402
+
+
+class FakeRoot:
+    def __init__(self):
+        self.now_ms = 0.0
+        self.timers = []
+        self.seq = 0
+        self.geometry_calls = 0
+        self.winfo_calls = 0
+        self.x = 100
+        self.y = 100
+
+    # Tk surface used by the drag code
+    def geometry(self, spec):
+        self.geometry_calls += 1
+        _, x, y = spec.split("+")
+        self.x, self.y = int(x), int(y)
+
+    def winfo_x(self):
+        self.winfo_calls += 1
+        return self.x
+
+    def winfo_y(self):
+        self.winfo_calls += 1
+        return self.y
+
+    def winfo_screenwidth(self):
+        self.winfo_calls += 1
+        return 1920
+
+    def winfo_screenheight(self):
+        self.winfo_calls += 1
+        return 1080
+
+    def after(self, ms, fn):
+        self.seq += 1
+        heapq.heappush(self.timers, (self.now_ms + ms, self.seq, fn))
+        return self.seq
+
+    def after_cancel(self, job):
+        self.timers = [t for t in self.timers if t[1] != job]
+        heapq.heapify(self.timers)
+
+    def advance(self, to_ms):
+        while self.timers and self.timers[0][0] <= to_ms:
+            when, _, fn = heapq.heappop(self.timers)
+            self.now_ms = when
+            fn()
+        self.now_ms = to_ms
+
+
+def pointer_path(rate, seconds):
+    # Pointer sweeps right/down; events arrive relative to a moving window
+    n = int(rate * seconds)
+    for i in range(n):
+        yield i * 1000.0 / rate, 500 + i // 3, 400 + i // 5
+
+
+def run_legacy(rate, seconds):
+    # Mirrors the old do_move: winfo_x/winfo_y + geometry() per event
+    root = FakeRoot()
+    start_x, start_y = 500 - root.x, 400 - root.y  # event.x/y at <Button-1>
+    for t, px, py in pointer_path(rate, seconds):
+        root.advance(t)
+        ex, ey = px - root.x, py - root.y  # window-relative event coords
+        x = root.winfo_x() + (ex - start_x)
+        y = root.winfo_y() + (ey - start_y)
+        root.geometry(f"+{int(x)}+{int(y)}")
+    return root
+
+
+def run_coalesced(rate, seconds, snap=False):
+    root = FakeRoot()
+    drag = DragController(root, snap=snap)
+    drag.place(root.x, root.y)
+    root.geometry_calls = 0
+    drag.begin(500, 400, 66, 24)
+    for t, px, py in pointer_path(rate, seconds):
+        root.advance(t)
+        drag.motion(px, py)
+    drag.end()
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=int, default=1000, help="motion events per second")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    events = int(args.rate * args.seconds)
+    print(f"{events} motion events @ {args.rate} Hz, frame = {DRAG_FRAME_MS} ms")
+    for name, root in (
+        ("legacy", run_legacy(args.rate, args.seconds)),
+        ("coalesced", run_coalesced(args.rate, args.seconds)),
+        ("coalesced+snap", run_coalesced(args.rate, args.seconds, snap=True)),
+    ):
+        print(
+            f"  {name:<15} geometry/s = {root.geometry_calls / args.seconds:8.1f}"
+            f"   winfo/s = {root.winfo_calls / args.seconds:8.1f}"
+            f"   final = +{root.x}+{root.y}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# Headless ClockEngine benchmarks (pytest-benchmark style stats, no Tk needed).
+#
+#   python benchmarks/bench_engine.py [--rounds 200] [--json results.json]
+#
+# Cases: cold start, per-tick cost, config flush cost, alarm evaluation (1k alarms),
+# calendar import and next-event lookup (5k ICS events, a third of them recurring).
+# --json writes the stats so runs can be diffed for regressions.
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from time_overlay import (  # noqa: E402
+    Alarm, CalendarIndex, ClockEngine, ConfigStore, FakeClock, NullAudioBackend, VERSION,
+)
+
+START = datetime(2026, 3, 2, 8, 0).timestamp()
+
+
+def bench(name, fn, rounds, setup=None):
+    # Time fn() `rounds` times; setup() runs untimed before each round
+    times = []
+    for _ in range(rounds):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg) if setup else fn()
+        times.append(time.perf_counter() - t0)
+    return {
+        "name": name,
+        "rounds": rounds,
+        "min": min(times),
+        "max": max(times),
+        "mean": statistics.fmean(times),
+        "median": statistics.median(times),
+        "stddev": statistics.stdev(times) if rounds > 1 else 0.0,
+    }
+
+
+def write_config(path, alarms):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[window]\nx = 100\ny = 100\nzones = UTC, Tokyo=Asia/Tokyo\n\n")
+        f.write("[countdowns]\n1 = daily|17:30|local|Home\n\n[alarms]\n")
+        for i in range(1, alarms + 1):
+            f.write(f"{i} = 1|daily|{i // 60 % 24:02d}:{i % 60:02d}|Alarm {i}\n")
+
+
+def write_ics(path, events):
+    start = datetime(2026, 1, 5, 18, 0)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+        for i in range(events):
+            at = start + timedelta(hours=7 * i)
+            f.write(f"BEGIN:VEVENT\r\nUID:{i}@bench\r\nDTSTART;TZID=Europe/Berlin:{at:%Y%m%dT%H%M%S}\r\n"
+                    f"SUMMARY:Event {i}\r\n")
+            if i % 3 == 0:
+                f.write(("RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR\r\n", "RRULE:FREQ=DAILY;INTERVAL=2;COUNT=30\r\n",
+                         "RRULE:FREQ=MONTHLY;BYMONTHDAY=1,15\r\n")[i % 9 // 3])
+            f.write("END:VEVENT\r\n")
+        f.write("END:VCALENDAR\r\n")
+
+
+def make_engine(path, clock=None):
+    engine = ClockEngine(ConfigStore(path), clock=clock or FakeClock(START), audio_backend=NullAudioBackend())
+    engine.set_zones(engine.config.get("window", "zones", fallback=""))
+    engine.load_countdowns()
+    engine.load_alarms()
+    return engine
+
+
+def run(rounds, alarm_count, event_count):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.ini")
+        write_config(path, 10)
+        results.append(bench("cold_start", lambda: make_engine(path), rounds))
+
+        # Per tick: one display minute of wall time per call
+        clock = FakeClock(START)
+        engine = make_engine(path, clock)
+
+        def tick():
+            clock.advance(60)
+            engine.tick(clock.now())
+        results.append(bench("tick", tick, rounds * 10))
+
+        # Config flush: one changed key + atomic write
+        engine = make_engine(path)
+        counter = iter(range(10 ** 9))
+
+        def flush():
+            engine.config.set("window", "x", next(counter))
+            engine.config.flush()
+        results.append(bench("config_flush", flush, rounds))
+
+        # Alarm evaluation: due() over a 1k-alarm heap, one minute per call
+        big = os.path.join(tmp, "big.ini")
+        write_config(big, alarm_count)
+        clock = FakeClock(START)
+        engine = make_engine(big, clock)
+
+        def evaluate():
+            clock.advance(60)
+            engine.check_alarms(clock.now())
+        results.append(bench(f"alarm_eval_{alarm_count}", evaluate, rounds * 10))
+
+        # Rescheduling cost: replace one alarm in the full heap
+        now = clock.now()
+
+        def reschedule():
+            at = now + timedelta(minutes=5)
+            engine.alarms.add(Alarm("1", at.hour, at.minute, "moved"), now)
+        results.append(bench(f"alarm_add_{alarm_count}", reschedule, rounds * 10))
+
+        # Calendar: streaming import, then bisect lookups over the expanded horizon
+        ics = os.path.join(tmp, "guild.ics")
+        write_ics(ics, event_count)
+
+        def load():
+            with open(ics, encoding="utf-8", newline="") as f:
+                return CalendarIndex.load(f, START)
+        results.append(bench(f"calendar_import_{event_count}", load, max(1, rounds // 20)))
+        index = load()
+        steps = iter(range(10 ** 9))
+        results.append(bench(f"calendar_next_{event_count}",
+                             lambda: index.next_event(START + next(steps) * 60), rounds * 10))
+        steps = iter(range(10 ** 9))
+        results.append(bench(f"calendar_due_{event_count}",
+                             lambda: index.due(START + next(steps) * 60, 300), rounds * 10))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--alarms", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--json", metavar="FILE", help="write results as JSON")
+    args = parser.parse_args()
+
+    # The engine's own warnings (e.g. no Windows alarm sound here) would drown the table
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run(args.rounds, args.alarms, args.events)
+    print(f"{'name':<22}{'min':>10}{'median':>10}{'mean':>10}{'max':>10}{'stddev':>10}  rounds  (µs)")
+    for r in results:
+        print(f"{r['name']:<22}" + "".join(f"{r[k] * 1e6:10.1f}" for k in ("min", "median", "mean", "max", "stddev"))
+              + f"  {r['rounds']:6d}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": VERSION,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "datetime": datetime.now().isoformat(timespec="seconds"),
+                "benchmarks": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
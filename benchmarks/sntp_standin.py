@@ -0,0 +1,76 @@
+# Local SNTP stand-in: answers on 127.0.0.1 with a clock shifted by --offset seconds.
+#
+#   python benchmarks/sntp_standin.py [--port 12300] [--offset 2.5] [--delay 0.02]
+#   python benchmarks/sntp_standin.py --check   # query it with the overlay's NtpSync and compare
+#
+# Point a running overlay at it with `ntp_server = 127.0.0.1:12300` in config.ini.
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from time_overlay import NtpSync, OffsetClock, unix_to_ntp  # noqa: E402
+
+
+def serve(sock, offset, delay, echo=True, latency=0.0):
+    # echo=False answers with a wrong originate timestamp, which clients must reject;
+    # latency simulates network delay (counted in the round trip, unlike `delay`)
+    while True:
+        try:
+            request, addr = sock.recvfrom(512)
+        except OSError:
+            return  # closed
+        time.sleep(latency)
+        received = time.time() + offset
+        if len(request) < 48:
+            continue
+        time.sleep(delay)  # simulated server-side processing
+        reply = (
+            bytes([0x24, 2, 6, 0xEC])   # LI 0, version 4, mode 4 (server), stratum 2
+            + bytes(20)                 # root delay/dispersion, reference id, reference time
+            + (request[40:48] if echo else bytes(8))  # originate = client's transmit time
+            + unix_to_ntp(received)
+            + unix_to_ntp(time.time() + offset)
+        )
+        sock.sendto(reply, addr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=12300)
+    parser.add_argument("--offset", type=float, default=2.5, help="seconds the stand-in clock is ahead")
+    parser.add_argument("--delay", type=float, default=0.02, help="seconds between receive and transmit")
+    parser.add_argument("--check", action="store_true", help="run NtpSync against it and exit")
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0 if args.check else args.port))
+    port = sock.getsockname()[1]
+    thread = threading.Thread(target=serve, args=(sock, args.offset, args.delay), daemon=True)
+    thread.start()
+
+    if not args.check:
+        print(f"SNTP stand-in on 127.0.0.1:{port}, offset {args.offset:+.3f} s (Ctrl+C to stop)")
+        try:
+            thread.join()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    clock = OffsetClock()
+    sync = NtpSync(clock, f"127.0.0.1:{port}")
+    for _ in range(5):
+        sync.sync_once()
+        print(sync.status())
+    sock.close()
+    error = abs(clock.offset - args.offset)
+    print(f"expected {args.offset:+.3f} s, applied {clock.offset:+.3f} s, error {error * 1000:.1f} ms")
+    sys.exit(0 if sync.samples and error < 0.05 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Memory soak: weeks of simulated ticks, alarms, snoozes and config saves on the headless engine.
+#
+#   python benchmarks/soak_memory.py [--weeks 4] [--alarms 200] [--resolution 60] [--trace]
+#
+# Prints RSS (and traced Python memory with --trace) once per simulated day and fails
+# if either keeps growing after the first day's warm-up.
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from time_overlay import (  # noqa: E402
+    ClockEngine, ConfigStore, FakeClock, HistoryLog, NullAudioBackend, memory_report, rss_bytes,
+)
+
+RSS_SLACK = 2 * 2 ** 20      # allowed RSS growth from day 1 to the end
+TRACED_SLACK = 256 * 1024    # allowed traced-allocation growth
+
+
+def write_config(path, alarms):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[window]\nzones = UTC, Tokyo=Asia/Tokyo, NY=America/New_York\n\n")
+        f.write("[countdowns]\n1 = daily|00:00|UTC|Reset\n2 = every:90|00:00|local|Boss\n\n[alarms]\n")
+        for i in range(1, alarms + 1):
+            repeat = ("daily", "weekdays", "every:45")[i % 3]
+            f.write(f"{i} = 1|{repeat}|{i // 60 % 24:02d}:{i % 60:02d}|Alarm {i}\n")
+
+
+def soak(weeks, alarms, resolution, trace):
+    import tracemalloc
+    if trace:
+        tracemalloc.start(8)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.ini")
+        write_config(path, alarms)
+        clock = FakeClock(datetime(2026, 3, 2).timestamp())
+        engine = ClockEngine(ConfigStore(path), clock=clock, audio_backend=NullAudioBackend())
+        engine.set_zones(engine.config.get("window", "zones"))
+        engine.load_countdowns()
+        engine.load_alarms()
+        engine.show_seconds = resolution < 60
+        history = HistoryLog(os.path.join(tmp, "alarm_history.jsonl"))
+
+        ticks_per_day = 86400 // resolution
+        rows = []
+        fired_total = 0
+        started = time.perf_counter()
+        for day in range(weeks * 7 + 1):
+            for tick in range(ticks_per_day):
+                clock.advance(resolution)
+                now = clock.now()
+                _, fired = engine.tick(now)
+                for alarm in fired:
+                    history.log("fire", now, id=alarm.id, message=alarm.message)
+                fired_total += len(fired)
+                if fired and tick % 7 == 0:  # snooze now and then, like a player would
+                    engine.snooze([alarm.message for alarm in fired])
+                if tick % (3600 // resolution) == 0:  # a save every hour: one-off alarm + flush
+                    engine.add_once(now.strftime("%H:%M"), "One-off")
+                    engine.config.flush()
+            rss = rss_bytes() or 0
+            traced = tracemalloc.get_traced_memory()[0] if trace else 0
+            rows.append((day, rss, traced, len(engine.alarms), len(engine.alarms.heap)))
+            print(f"day {day:3d}  RSS {rss / 2 ** 20:7.2f} MB  traced {traced / 1024:8.1f} KB  "
+                  f"alarms {len(engine.alarms):5d}  heap {len(engine.alarms.heap):5d}", flush=True)
+        history.close()
+        if trace:
+            print("top traced subsystems:")
+            for name, size, count in memory_report(8):
+                print(f"  {name:<20}{size / 1024:8.1f} KB {count:7d} blocks")
+    print(f"{fired_total} alarms fired, {len(rows) * ticks_per_day} ticks in {time.perf_counter() - started:.1f} s")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--alarms", type=int, default=200)
+    parser.add_argument("--resolution", type=int, default=60, help="seconds per tick (60 = HH:MM, 1 = HH:MM:SS)")
+    parser.add_argument("--trace", action="store_true", help="also track tracemalloc totals (slower)")
+    args = parser.parse_args()
+
+    rows = soak(args.weeks, args.alarms, args.resolution, args.trace)
+    # Day 0 warms caches (zone offsets, sound preload, heap); compare day 1 with the last three days
+    base_rss, base_traced = rows[1][1], rows[1][2]
+    end_rss = statistics.median(row[1] for row in rows[-3:])
+    end_traced = statistics.median(row[2] for row in rows[-3:])
+    ok = end_rss - base_rss <= RSS_SLACK and end_traced - base_traced <= TRACED_SLACK
+    print(f"RSS growth {(end_rss - base_rss) / 1024:+.0f} KB, traced growth {(end_traced - base_traced) / 1024:+.0f} KB"
+          f" → {'flat' if ok else 'GROWING'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import time
+import wave
+
+from time_overlay import AlarmAudio, NullAudioBackend
+
+
+def make_wav(path):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(bytes(800))
+    return str(path)
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_cache_is_lru_and_bounded(tmp_path):
+    paths = [make_wav(tmp_path / f"{name}.wav") for name in "abc"]
+    audio = AlarmAudio(NullAudioBackend(), default_path=paths[0], cache_size=2)
+    audio.preload(paths[1:])  # capped at cache_size: default + b
+    assert list(audio.cache) == paths[:2] and audio.loads == 2
+    audio.load(paths[0])       # hit: a becomes most recent
+    audio.load(paths[2])       # miss: evicts b, the least recently used
+    assert list(audio.cache) == [paths[0], paths[2]] and audio.loads == 3
+    audio.load(paths[1])
+    assert audio.loads == 4
+
+
+def test_plays_on_the_audio_thread_and_beeps_without_a_sound(tmp_path, capsys):
+    backend = NullAudioBackend()
+    audio = AlarmAudio(backend, default_path=make_wav(tmp_path / "default.wav"))
+    audio.play()
+    assert wait_for(lambda: backend.plays == 1)
+    audio.play(str(tmp_path / "missing.wav"))  # falls back to the default sound
+    assert wait_for(lambda: backend.plays == 2)
+    assert backend.beeps == 0
+    broken = AlarmAudio(backend, default_path=str(tmp_path / "none.wav"))
+    broken.play()
+    assert wait_for(lambda: backend.beeps == 1)
+    assert "Alarm sound unavailable" in capsys.readouterr().out
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from time_overlay import Alarm, AlarmEngine
+
+FRIDAY_5PM = datetime(2026, 3, 6, 17, 0)
+MONDAY_7PM = datetime(2026, 3, 9, 19, 0)
+
+
+def test_daily_alarm_fires_once_and_reschedules():
+    engine = AlarmEngine()
+    alarm = Alarm("1", 18, 30, "Raid")
+    engine.add(alarm, FRIDAY_5PM)
+    assert engine.due(datetime(2026, 3, 6, 18, 29)) == []
+    assert engine.due(datetime(2026, 3, 6, 18, 30)) == [alarm]
+    assert alarm.next_fire == datetime(2026, 3, 7, 18, 30)
+
+
+def test_weekdays_skip_the_weekend():
+    engine = AlarmEngine()
+    alarm = Alarm("1", 18, 30, "Work", "weekdays")
+    engine.add(alarm, datetime(2026, 3, 6, 19, 0))
+    assert alarm.next_fire == datetime(2026, 3, 9, 18, 30)
+
+
+def test_catch_up_uses_latest_missed_slot():
+    # Asleep from Friday 17:00 to Monday 19:00: Monday 18:30 was 30 min ago, so it fires
+    for repeat in ("weekdays", "daily", "every"):
+        engine = AlarmEngine()
+        alarm = Alarm("1", 18, 30, "x", repeat, interval=45)
+        engine.add(alarm, FRIDAY_5PM)
+        assert engine.due(MONDAY_7PM) == [alarm], repeat
+        assert alarm.due_at == datetime(2026, 3, 9, 18, 30)
+        assert alarm.next_fire > MONDAY_7PM
+
+
+def test_catch_up_limit_drops_old_one_shots():
+    engine = AlarmEngine()
+    alarm = Alarm("1", 8, 0, "Old", "once", at=datetime(2026, 3, 6, 8, 0))
+    engine.add(alarm, FRIDAY_5PM - timedelta(hours=10))
+    assert engine.due(MONDAY_7PM) == []
+    assert not alarm.enabled
+
+
+def test_removed_and_rescheduled_alarms_leave_no_live_heap_entries():
+    engine = AlarmEngine()
+    now = datetime(2026, 3, 2, 8, 0)
+    for i in range(200):
+        engine.add(Alarm("1", 9, i % 60, "moved"), now)
+    assert len(engine) == 1
+    assert engine.next_fire() == datetime(2026, 3, 2, 9, 199 % 60)
+    engine.remove("1")
+    assert engine.next_fire() is None
+    assert engine.due(now + timedelta(days=2)) == []
+
+
+def test_spec_round_trip_keeps_percent_signs():
+    now = datetime(2026, 3, 2, 8, 0)
+    alarm = Alarm.from_spec("3", "1|every:30|07:15|Boss at 50% HP", now)
+    assert (alarm.repeat, alarm.interval, alarm.message) == ("every", 30, "Boss at 50% HP")
+    assert Alarm.from_spec("3", alarm.to_spec(), now).to_spec() == alarm.to_spec()
@@ -0,0 +1,97 @@
+import io
+from datetime import datetime, timezone
+
+import pytest
+
+from time_overlay import CalendarIndex, parse_rrule, rrule_dates
+
+NOW = datetime(2026, 3, 2, 8, 0, tzinfo=timezone.utc).timestamp()
+
+
+def ics(*events):
+    return io.StringIO("BEGIN:VCALENDAR\r\n" + "".join(events) + "END:VCALENDAR\r\n")
+
+
+def event(uid, start, rule=None, extra=""):
+    text = f"BEGIN:VEVENT\r\nUID:{uid}\r\nDTSTART:{start}\r\nSUMMARY:{uid}\r\n"
+    if rule:
+        text += f"RRULE:{rule}\r\n"
+    return text + extra + "END:VEVENT\r\n"
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def take(generator, n):
+    return [next(generator) for _ in range(n)]
+
+
+def test_weekly_byday():
+    rule = parse_rrule("FREQ=WEEKLY;BYDAY=TU,TH")
+    dates = take(rrule_dates(utc(2026, 3, 3, 20), rule), 4)
+    assert dates == [utc(2026, 3, 3, 20), utc(2026, 3, 5, 20), utc(2026, 3, 10, 20), utc(2026, 3, 12, 20)]
+
+
+def test_monthly_negative_monthday_and_short_months():
+    rule = parse_rrule("FREQ=MONTHLY;BYMONTHDAY=30,-1")
+    dates = take(rrule_dates(utc(2026, 1, 30, 7), rule), 5)
+    assert dates == [utc(2026, 1, 30, 7), utc(2026, 1, 31, 7), utc(2026, 2, 28, 7),
+                     utc(2026, 3, 30, 7), utc(2026, 3, 31, 7)]
+
+
+def test_rule_that_never_matches_ends():
+    rule = parse_rrule("FREQ=MONTHLY;INTERVAL=12;BYMONTHDAY=30")  # only ever February
+    assert list(rrule_dates(utc(2023, 2, 28), rule)) == [utc(2023, 2, 28)]
+
+
+def test_dst_keeps_wall_clock_time():
+    from zoneinfo import ZoneInfo
+    berlin = ZoneInfo("Europe/Berlin")
+    dates = take(rrule_dates(datetime(2026, 3, 27, 20, tzinfo=berlin), parse_rrule("FREQ=DAILY")), 3)
+    assert [d.hour for d in dates] == [20, 20, 20]
+    assert dates[2].timestamp() - dates[1].timestamp() == 23 * 3600  # 29 March: clocks go forward
+
+
+@pytest.mark.parametrize("rule", ["FREQ=DAILY;INTERVAL=abc", "FREQ=DAILY;COUNT=x", "FREQ=WEEKLY;BYDAY=XX",
+                                  "FREQ=MONTHLY;BYMONTHDAY=x", "FREQ=DAILY;INTERVAL=0",
+                                  "FREQ=DAILY;UNTIL=soon"])
+def test_malformed_rule_skips_only_that_event(rule):
+    index = CalendarIndex.load(ics(event("bad", "20260303T100000Z", rule), event("good", "20260303T110000Z")), NOW)
+    assert (index.imported, index.skipped) == (1, 1)
+    assert index.next_event(NOW) == (utc(2026, 3, 3, 11).timestamp(), "good")
+
+
+def test_count_until_exdate_and_overrides():
+    index = CalendarIndex.load(ics(
+        event("a", "20260302T200000Z", "FREQ=DAILY;COUNT=4", "EXDATE:20260303T200000Z\r\n"),
+        event("a", "20260304T210000Z", extra="RECURRENCE-ID:20260304T200000Z\r\n"),
+        event("b", "20260302T120000Z", "FREQ=DAILY;UNTIL=20260303T120000Z"),
+        event("c", "20260302T130000Z", extra="STATUS:CANCELLED\r\n"),
+    ), NOW)
+    got = [(datetime.fromtimestamp(ts, timezone.utc).strftime("%d %H"), name)
+           for ts, name in index.between(NOW, NOW + 10 * 86400)]
+    assert got == [("02 12", "b"), ("02 20", "a"), ("03 12", "b"), ("04 21", "a"), ("05 20", "a")]
+
+
+def test_next_event_beyond_horizon_and_between():
+    index = CalendarIndex.load(ics(event("far", "20270101T000000Z"), event("soon", "20260303T000000Z")), NOW)
+    assert index.next_event(NOW)[1] == "soon"
+    assert index.next_event(utc(2026, 3, 4).timestamp())[1] == "far"
+    assert index.next_event(utc(2027, 1, 2).timestamp()) is None
+    assert index.between(NOW, utc(2026, 12, 31).timestamp()) == [(utc(2026, 3, 3).timestamp(), "soon")]
+
+
+def test_due_alerts_once_with_lead_including_events_right_after_import():
+    index = CalendarIndex.load(ics(event("soon", "20260302T080200Z"), event("later", "20260302T090000Z")), NOW)
+    assert index.due(NOW, 300) == [(NOW + 120, "soon")]  # starts 2 min after the import
+    assert index.due(NOW + 60, 300) == []
+    assert index.due(NOW + 3300, 300) == [(NOW + 3600, "later")]
+    assert index.next_alert(300) is None
+
+
+def test_line_folding_and_escapes():
+    index = CalendarIndex.load(io.StringIO(
+        "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nDTSTART:20260303T100000Z\r\nSUMMARY:Raid\\, Molten \r\n Core\r\n"
+        "BEGIN:VALARM\r\nSUMMARY:ignored\r\nEND:VALARM\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"), NOW)
+    assert index.next_event(NOW)[1] == "Raid, Molten Core"
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from time_overlay import ClockEngine, ConfigStore, FakeClock, NullAudioBackend
+
+MONDAY_8AM = datetime(2026, 3, 2, 8, 0)
+
+
+def make_engine(tmp_path, alarms=()):
+    store = ConfigStore(str(tmp_path / "config.ini"))
+    for alarm_id, spec in alarms:
+        store.set("alarms", alarm_id, spec)
+    engine = ClockEngine(store, clock=FakeClock(MONDAY_8AM.timestamp()), audio_backend=NullAudioBackend())
+    engine.load_alarms(preload=False)
+    return engine
+
+
+def test_add_once_reuses_only_its_own_spent_ids(tmp_path):
+    # A user's disabled one-shots, numbered like the dialog's, must survive scripted alarms
+    engine = make_engine(tmp_path, [("1", "0|daily|12:00|Lunch"),
+                                    ("2", "0|once|2026-03-01 09:00|Dentist"),
+                                    ("3", "0|once|2026-03-01 10:00|Call back")])
+    first = engine.add_once("08:01", "Raid")
+    second = engine.add_once("08:02", "Boss")
+    assert (first.id, second.id) == ("script1", "script2")
+    engine.clock.advance(90)
+    assert [a.id for a in engine.check_alarms(engine.clock.now())] == ["script1"]
+    third = engine.add_once("09:00", "Again")
+    assert third.id == "script1"  # the spent scripted id, not "2" or "3"
+    saved = dict(engine.config.items("alarms"))
+    assert saved["2"].endswith("Dentist") and saved["3"].endswith("Call back")
+    assert saved["script1"].endswith("Again")
+    assert engine.primary_alarm().id == "1"
+    engine.clock.advance(timedelta(hours=2).total_seconds())
+    assert {a.id for a in engine.check_alarms(engine.clock.now())} == {"script1", "script2"}
+
+
+def test_no_sound_device_skips_the_preload(tmp_path, capsys):
+    engine = make_engine(tmp_path, [("1", "1|daily|12:00|Lunch")])
+    engine.audio.default_path = str(tmp_path / "Alarm03.wav")  # missing, as off Windows
+    engine.load_alarms()
+    engine.reload_alarms()
+    assert engine.audio.loads == 0
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,64 @@
+import os
+
+from time_overlay import ConfigStore
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))  # a visible mtime step
+
+
+def test_writes_are_batched_until_flush(tmp_path):
+    path = tmp_path / "config.ini"
+    store = ConfigStore(str(path))
+    store.set("window", "x", 10)
+    store.set("window", "y", 20)
+    assert not path.exists()
+    store.flush()
+    assert store.writes == 1
+    assert ConfigStore(str(path)).getint("window", "y") == 20
+    store.set("window", "x", 10)  # unchanged value: nothing to write
+    store.flush()
+    assert store.writes == 1
+
+
+def test_percent_in_values_is_literal(tmp_path):
+    path = tmp_path / "config.ini"
+    store = ConfigStore(str(path))
+    store.set("alarms", "1", "1|once|2026-03-02 10:00|50% HP boss")
+    store.flush()
+    write(path, path.read_text(encoding="utf-8") + "[alarms2]\nmsg = 100%\n")
+    assert store.check() == {("alarms2", "msg")}
+    assert store.get("alarms2", "msg") == "100%"
+    store.set("alarms2", "msg", "99% %(x)s")
+    store.flush()
+    assert ConfigStore(str(path)).get("alarms2", "msg") == "99% %(x)s"
+
+
+def test_external_edit_merges_with_unflushed_keys(tmp_path):
+    path = tmp_path / "config.ini"
+    write(path, "[window]\nx = 1\ny = 2\nalpha = 90\n")
+    store = ConfigStore(str(path))
+    changed = []
+    store.listener = changed.append
+    store.set("window", "x", 5)        # pending: wins over the file
+    store.remove("window", "alpha")    # pending removal: stays removed
+    write(path, "[window]\nx = 100\ny = 3\nalpha = 80\n[alarms]\n1 = 1|daily|08:00|Up\n")
+    assert store.check() == {("window", "y"), ("alarms", "1")}
+    assert changed == [{("window", "y"), ("alarms", "1")}]
+    assert store.getint("window", "x") == 5
+    assert store.getint("window", "y") == 3
+    assert store.get("window", "alpha") is None
+    store.flush()
+    text = path.read_text(encoding="utf-8")
+    assert "x = 5" in text and "y = 3" in text and "alpha" not in text
+
+
+def test_unwritable_directory_only_reports(tmp_path, capsys):
+    store = ConfigStore(str(tmp_path / "missing" / "config.ini"))
+    store.set("window", "x", 1)
+    store.flush()  # must not raise: exit_app() flushes before quitting
+    assert "Config write error" in capsys.readouterr().out
+    assert store.dirty
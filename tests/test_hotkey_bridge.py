@@ -0,0 +1,61 @@
+from time_overlay import HOTKEY_EVENT, HotkeyBridge, NullHotkeyBackend
+
+
+class FakeRoot:
+    # Records bind/event_generate; the test calls drain() where Tk would
+    def __init__(self):
+        self.bindings = {}
+        self.events = 0
+
+    def bind(self, sequence, callback):
+        self.bindings[sequence] = callback
+
+    def event_generate(self, sequence, when=None):
+        assert sequence == HOTKEY_EVENT
+        self.events += 1
+
+
+def make_bridge(**handlers):
+    root = FakeRoot()
+    backend = NullHotkeyBackend()
+    return root, backend, HotkeyBridge(root, backend, handlers)
+
+
+def test_press_queues_and_wakes_once_per_batch():
+    calls = []
+    root, backend, bridge = make_bridge(toggle=lambda: calls.append("toggle"))
+    bridge.bind("toggle", "F12")
+    backend.press("f12")
+    backend.press("F12")
+    assert calls == [] and root.events == 1  # nothing runs off the Tk thread
+    root.bindings[HOTKEY_EVENT]()
+    assert calls == ["toggle", "toggle"]
+    backend.press("F12")
+    assert root.events == 2
+
+
+def test_rebinding_swaps_only_changed_keys():
+    root, backend, bridge = make_bridge(toggle=lambda: None)
+    bridge.bind("toggle", "F12")
+    bridge.bind("toggle", "F12")
+    assert list(backend.bindings) == ["f12"]
+    bridge.bind("toggle", "F11")
+    assert list(backend.bindings) == ["f11"]
+    bridge.close()
+    assert backend.bindings == {}
+
+
+def test_commands_with_arguments_and_bad_input():
+    alarms = []
+
+    def set_alarm(when, message):
+        hour, minute = when.split(":")
+        alarms.append((int(hour), int(minute), message))
+
+    root, backend, bridge = make_bridge(set_alarm=set_alarm)
+    bridge.push("set_alarm", "18:30", "Raid")
+    bridge.push("set_alarm", "bad", "x")  # ValueError is reported, later commands still run
+    bridge.push("unknown")
+    bridge.push("set_alarm", "07:05", "50% HP")
+    bridge.drain()
+    assert alarms == [(18, 30, "Raid"), (7, 5, "50% HP")]
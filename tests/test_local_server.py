@@ -0,0 +1,24 @@
+import socket
+
+from time_overlay import StatsServer
+
+
+def fetch(port):
+    with socket.create_connection(("127.0.0.1", port), timeout=2.0) as conn:
+        return conn.recv(1024).decode("utf-8")
+
+
+def test_closed_server_frees_its_port():
+    # A stats_port reload closes the running server and binds again, possibly on the same port
+    server = StatsServer(0, lambda: '{"server": 1}')
+    server.start()
+    port = server.port
+    assert fetch(port) == '{"server": 1}'
+    server.close()
+    assert not server.thread.is_alive()
+    again = StatsServer(port, lambda: '{"server": 2}')
+    again.start()
+    try:
+        assert fetch(port) == '{"server": 2}'
+    finally:
+        again.close()
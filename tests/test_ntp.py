@@ -0,0 +1,114 @@
+import os
+import socket
+import sys
+import threading
+from contextlib import contextmanager
+import pytest
+
+import time_overlay
+from time_overlay import HotkeyBridge, NtpSync, NullHotkeyBackend, OffsetClock, TickScheduler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+from sntp_standin import serve  # noqa: E402
+
+
+@contextmanager
+def standin(offset, delay=0.0, echo=True, latency=0.0):
+    # The benchmarks' SNTP stand-in on an ephemeral 127.0.0.1 port
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    threading.Thread(target=serve, args=(sock, offset, delay, echo, latency), daemon=True).start()
+    try:
+        yield sock.getsockname()[1]
+    finally:
+        sock.close()
+
+
+def test_offset_is_applied_then_smoothed():
+    clock = OffsetClock()
+    with standin(2.5) as port:
+        sync = NtpSync(clock, f"127.0.0.1:{port}")
+        assert sync.sync_once()
+    assert sync.offset == pytest.approx(2.5, abs=0.05)
+    assert clock.offset == sync.offset
+    with standin(3.5) as port:
+        sync.port = port
+        assert sync.sync_once()
+    # one sample moves the offset NTP_SMOOTHING of the way
+    assert sync.offset == pytest.approx(2.5 + time_overlay.NTP_SMOOTHING * 1.0, abs=0.05)
+    assert sync.samples == 2 and "RTT" in sync.status()
+
+
+def test_slow_reply_is_dropped(monkeypatch):
+    monkeypatch.setattr(time_overlay, "NTP_MAX_RTT", 0.02)
+    clock = OffsetClock()
+    with standin(2.5, latency=0.1) as port:
+        sync = NtpSync(clock, f"127.0.0.1:{port}")
+        assert not sync.sync_once()
+    assert sync.samples == 0 and clock.offset == 0.0
+    assert "sample dropped" in sync.error
+
+
+def test_reply_with_wrong_originate_is_rejected():
+    clock = OffsetClock()
+    with standin(2.5, echo=False) as port:
+        sync = NtpSync(clock, f"127.0.0.1:{port}")
+        sync.timeout = 0.2
+        assert not sync.sync_once()
+    assert sync.samples == 0 and clock.offset == 0.0
+    assert sync.error  # timed out waiting for a matching reply
+
+
+def test_stopped_sync_does_not_publish():
+    clock = OffsetClock()
+    with standin(2.5) as port:
+        sync = NtpSync(clock, f"127.0.0.1:{port}")
+        sync.stop_event = threading.Event()
+        sync.stop_event.set()
+        assert not sync.sync_once()
+    assert clock.offset == 0.0
+
+
+def test_bad_port_is_a_config_error():
+    with pytest.raises(ValueError):
+        NtpSync(OffsetClock(), "127.0.0.1:70000")
+
+
+class FakeRoot:
+    def __init__(self):
+        self.jobs = {}
+        self.bindings = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.jobs[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def bind(self, sequence, callback):
+        self.bindings[sequence] = callback
+
+    def event_generate(self, sequence, when=None):
+        self.bindings[sequence]()  # as if the Tk loop woke up right away
+
+
+def test_large_step_redraws_at_once():
+    root = FakeRoot()
+    clock = OffsetClock()  # the stand-in serves real time + offset
+    seen = []
+    ticker = TickScheduler(root, seen.append, clock=clock)
+    bridge = HotkeyBridge(root, NullHotkeyBackend(), {"clock_stepped": ticker.resync})
+    ticker.start()
+    with standin(300) as port:
+        sync = NtpSync(clock, f"127.0.0.1:{port}", on_step=lambda: bridge.push("clock_stepped"))
+        assert sync.sync_once()
+    assert len(seen) == 2  # redrawn right away, not at the next minute boundary
+    assert (seen[-1] - seen[0]).total_seconds() == pytest.approx(300, abs=1)
+    assert ticker.jumps == 1
+    with standin(300.2) as port:  # small correction: no extra redraw
+        sync.port = port
+        sync.sync_once()
+    assert len(seen) == 2
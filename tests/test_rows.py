@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from time_overlay import Stopwatch, ZoneClock
+
+# Europe/Berlin springs forward at 01:00 UTC on 2026-03-29 (02:00 CET → 03:00 CEST)
+BERLIN_DST = int(datetime(2026, 3, 29, 1, 0, tzinfo=timezone.utc).timestamp())
+
+
+def test_offset_at_across_dst_transition():
+    zone = ZoneClock("Berlin", ZoneInfo("Europe/Berlin"))
+    assert zone.offset_at(BERLIN_DST - 1) == 3600
+    assert zone.offset_at(BERLIN_DST) == 7200
+
+
+def test_cached_offset_is_valid_up_to_the_transition():
+    zone = ZoneClock("Berlin", ZoneInfo("Europe/Berlin"))
+    assert zone.text(BERLIN_DST - 3 * 86400) == "Berlin 02:00"
+    assert zone.valid_until == BERLIN_DST  # bisected to the second
+    assert zone.text(BERLIN_DST - 1) == "Berlin 01:59"
+    assert zone.refreshes == 1
+    assert zone.text(BERLIN_DST) == "Berlin 03:00"
+    assert zone.refreshes == 2
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_countdown_stops_on_zero_and_reports_once():
+    timer = FakeTimer()
+    stopwatch = Stopwatch(timer=timer)
+    stopwatch.reset(duration=10)
+    stopwatch.start()
+    timer.now += 9.95
+    assert stopwatch.text() == "⏱ 00:00.1"  # ceils: never shows 0.0 before it is over
+    assert not stopwatch.check_finished()
+    timer.now += 0.5
+    assert stopwatch.check_finished()
+    assert not stopwatch.check_finished()
+    assert stopwatch.value() == 0.0 and stopwatch.finished() and not stopwatch.running
+    assert stopwatch.text() == "⏱ 00:00.0"
+    stopwatch.start()  # a finished countdown stays at zero until reset
+    assert not stopwatch.running
+
+
+def test_count_up_excludes_paused_time():
+    timer = FakeTimer()
+    stopwatch = Stopwatch(timer=timer)
+    stopwatch.start()
+    timer.now += 61.25
+    stopwatch.pause()
+    timer.now += 100
+    assert stopwatch.text() == "⏱ 01:01.2"
+    stopwatch.start()
+    timer.now += 3600
+    assert stopwatch.text() == "⏱ 1:01:01.2"
@@ -0,0 +1,21 @@
+from time_overlay import TextMetrics
+
+
+class FakeFont:
+    def measure(self, text):
+        return 8 * len(text)
+
+
+def test_widths_cache_is_lru_and_bounded():
+    metrics = TextMetrics(None, "Consolas", {}, cache_size=2)
+    metrics.fonts[18] = FakeFont()  # no Tk root needed
+    assert metrics.width(18, "00:00") == 40
+    assert metrics.width(18, "📅 Standup") == 72
+    assert metrics.width(18, "00:00") == 40  # hit: becomes most recent
+    assert metrics.measures == 2
+    metrics.width(18, "📅 Retro in 5 min")  # evicts the calendar row, not the clock
+    assert len(metrics.widths) == 2 and metrics.measures == 3
+    metrics.width(18, "00:00")
+    assert metrics.measures == 3
+    metrics.width(18, "📅 Standup")
+    assert metrics.measures == 4
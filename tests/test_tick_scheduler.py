@@ -0,0 +1,117 @@
+from datetime import datetime
+
+from time_overlay import FakeClock, LatencyHistogram, TickScheduler
+
+
+class FakeRoot:
+    # after() only records the job; the test fires it with run()
+    def __init__(self):
+        self.jobs = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.jobs[self.next_id] = (ms, callback)
+        return self.next_id
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def delay_ms(self):
+        (ms, _), = self.jobs.values()
+        return ms
+
+    def run(self, clock, early_ms=0):
+        # Fire the only pending job after sleeping its delay (minus early_ms) on the fake clock
+        (job, (ms, callback)), = self.jobs.items()
+        del self.jobs[job]
+        clock.advance((ms - early_ms) / 1000)
+        callback()
+
+
+def test_stop_inside_callback_leaves_nothing_armed():
+    root = FakeRoot()
+    clock = FakeClock(datetime(2026, 3, 2, 8, 0, 30).timestamp())
+    seen = []
+
+    def callback(now):
+        seen.append(now)
+        if len(seen) == 2:
+            ticker.stop()  # e.g. a hot reload setting alpha 0 suspends the overlay mid-tick
+
+    ticker = TickScheduler(root, callback, clock=clock)
+    ticker.start()
+    assert len(root.jobs) == 1
+    root.run(clock)
+    assert len(seen) == 2
+    assert root.jobs == {} and ticker.job is None
+
+
+def make(resolution=60, start=datetime(2026, 3, 2, 8, 0, 30, 250000), callback=None):
+    root = FakeRoot()
+    clock = FakeClock(start.timestamp())
+    seen = []
+    ticker = TickScheduler(root, callback or seen.append, resolution=resolution, clock=clock)
+    return root, clock, seen, ticker
+
+
+def test_minute_boundaries():
+    root, clock, seen, ticker = make()
+    ticker.start()
+    assert seen == [datetime(2026, 3, 2, 8, 0, 30, 250000)]  # drawn at once
+    assert root.delay_ms() == 29750  # then on the next minute
+    root.run(clock)
+    root.run(clock)
+    assert seen[1:] == [datetime(2026, 3, 2, 8, 1), datetime(2026, 3, 2, 8, 2)]
+    assert ticker.ticks == 3
+
+
+def test_second_boundaries_after_resolution_change():
+    root, clock, seen, ticker = make()
+    ticker.start()
+    ticker.set_resolution(1)  # resyncs: redraw now, then every second
+    assert len(seen) == 2 and root.delay_ms() == 750
+    root.run(clock)
+    assert seen[-1] == datetime(2026, 3, 2, 8, 0, 31)
+    assert root.delay_ms() == 1000
+
+
+def test_early_wake_rearms_without_callback():
+    root, clock, seen, ticker = make()
+    ticker.start()
+    root.run(clock, early_ms=40)  # after() fired 40 ms early
+    assert len(seen) == 1 and root.delay_ms() == 40
+    root.run(clock)
+    assert seen[-1] == datetime(2026, 3, 2, 8, 1)
+
+
+def test_lateness_is_recorded():
+    root, clock, seen, ticker = make()
+    ticker.lateness = LatencyHistogram("late")
+    ticker.start()
+    root.run(clock, early_ms=-12)  # 12 ms late
+    assert ticker.lateness.count == 1 and abs(ticker.lateness.max_ms - 12) < 1e-6
+
+
+def test_wall_clock_steps_count_as_jumps():
+    root, clock, seen, ticker = make()
+    ticker.start()
+    clock.step(300)  # forward (NTP step, resume)
+    root.run(clock)
+    assert ticker.jumps == 1 and seen[-1] == datetime(2026, 3, 2, 8, 6, 0)
+    assert root.delay_ms() == 60000  # re-anchored on the new wall time
+    clock.step(-3600)  # backward (DST end, manual change)
+    root.run(clock)
+    assert ticker.jumps == 2 and seen[-1] == datetime(2026, 3, 2, 7, 7)
+
+
+def test_callback_that_raises_still_rearms():
+    def callback(now):
+        raise RuntimeError("bad tick")
+
+    root, clock, seen, ticker = make(callback=callback)
+    try:
+        ticker.start()
+    except RuntimeError:
+        pass
+    assert ticker.job is not None and root.delay_ms() == 29750
@@ -0,0 +1,35 @@
+from time_overlay import TimerWheel
+
+
+def test_items_fire_at_their_second():
+    wheel = TimerWheel(1000)
+    wheel.add(1005, "a")
+    wheel.add(1005.2, "b")  # rounded up to 1006
+    assert wheel.advance(1004) == []
+    assert wheel.advance(1005) == ["a"]
+    assert wheel.advance(1006) == ["b"]
+    assert wheel.count == 0
+
+
+def test_far_items_cascade_down_the_levels():
+    wheel = TimerWheel(0)
+    wheel.add(64 ** 2 + 7, "far")
+    wheel.add(100, "near")
+    assert wheel.advance(99) == []
+    assert wheel.advance(100) == ["near"]
+    assert wheel.advance(64 ** 2 + 6) == []
+    assert wheel.advance(64 ** 2 + 7) == ["far"]
+
+
+def test_past_expiry_fires_on_next_advance():
+    wheel = TimerWheel(500)
+    wheel.add(400, "late")
+    assert wheel.advance(500) == ["late"]
+
+
+def test_clock_step_back_and_long_sleep_rebuild():
+    wheel = TimerWheel(1000)
+    wheel.add(1010, "x")
+    assert wheel.advance(900) == []  # stepped back: still pending
+    assert wheel.count == 1
+    assert wheel.advance(1000 + 64 ** 2 + 1) == ["x"]  # slept past it
@@ -1,11 +1,26 @@
+import time
+STARTUP_T0 = time.perf_counter()  # ✅ --profile-startup counts module imports too
 import tkinter as tk
-from datetime import datetime, timedelta  # ✅ fix 23:59→00:00
+import tkinter.font as tkfont
+from datetime import datetime, timedelta, timezone
+import bisect
 import ctypes
+import hashlib
+import heapq
+from collections import OrderedDict, deque
+import io
+import json
+import math
 import os
 import configparser
-import keyboard  # ✅ for global hotkey
+import queue
+import socket
+import sys
 import threading
-import winsound  # ✅ for sound
+from functools import partial
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+# ✅ Cheap stdlib modules are imported here; slow or platform ones (keyboard, winsound, wave, tempfile,
+# tkinter.messagebox) are imported where first used, after the first paint
 
 try:
     ctypes.windll.shcore.SetProcessDpiAwareness(1)
@@ -13,14 +28,2374 @@ except:
     pass
 
 CONFIG_FILE = "config.ini"
+CONFIG_FLUSH_DELAY_MS = 500  # ✅ debounce for batched config writes
+DRAG_FRAME_MS = 16  # ✅ at most one geometry update per display frame (~60 Hz)
+SNAP_DISTANCE = 12  # px from a screen edge at which the window snaps to it
+TIME_JUMP_THRESHOLD = 1.0  # s of wall-vs-monotonic drift treated as a clock step
+WINDOW_PAD_X = 15  # px from the widest row to the window edge (66 px for HH:MM at size 11)
+WINDOW_PAD_Y = 2   # px above the first and below the last row
+ALARM_CATCHUP_LIMIT = timedelta(hours=6)  # older missed alarms are skipped, not fired
+SNOOZE_MINUTES = 5
+ALERT_MAX_LINES = 8  # merged alarm popup shows at most this many messages
+REPEAT_LABELS = {"once": "Once", "daily": "Daily", "weekdays": "Weekdays", "every": "Every N min"}
+HOTKEY_EVENT = "<<HotkeyCommand>>"  # wakes the Tk loop to drain hotkey commands
+SANS_FONTS = ['Segoe UI', 'Helvetica', 'Arial', 'DejaVu Sans', 'Noto Sans']
+FONT_SIZES = list(reversed(range(10, 21)))       # 20 (top) → 10 (bottom)
+ALPHA_STEPS = list(reversed(range(0, 101, 5)))  # 100% (top) → 0% (bottom)
+ALARM_WAKE_MAX_MS = 6 * 3600 * 1000  # longest single sleep while hidden
+ZONE_SCAN_DAYS = 370  # look-ahead for the next UTC-offset change of a zone
+WHEEL_SLOTS = 64   # countdown timer wheel: slots per level
+WHEEL_LEVELS = 4   # 64**4 s ≈ 194 days before the top level wraps
+AUDIO_CACHE_SIZE = 8  # decoded WAV buffers kept in memory (LRU)
+TEXT_WIDTH_CACHE_SIZE = 256  # measured text widths kept in memory (LRU); calendar rows vary with event names
+STOPWATCH_FRAME_MS = 100  # default stopwatch frame budget: one redraw per tenth at most
+STOPWATCH_PRESETS = (60, 300, 600, 900)  # Stopwatch → Count down menu, seconds
+MMSS_TEXT = [f"{m:02d}:{s:02d}" for m in range(60) for s in range(60)]  # stopwatch digits, precomputed
+STATS_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000, 5000)  # histogram upper bounds; one overflow bucket
+STATS_FILE = "stats.json"  # Stats → Export writes here (next to config.ini)
+HISTORY_FILE = "alarm_history.jsonl"  # fired/dismissed/snoozed alarms, one JSON object per line
+HISTORY_MAX_BYTES = 256 * 1024  # rotate to alarm_history.jsonl.1 beyond this
+HISTORY_VIEW_LINES = 15  # entries in Right-click → History
+NTP_INTERVAL = 900  # s between SNTP queries (ntp_interval in config.ini)
+NTP_TIMEOUT = 2.0   # s to wait for a reply
+NTP_MAX_RTT = 0.5   # s; slower replies are too noisy to use
+NTP_SMOOTHING = 0.3  # weight of a new sample in the smoothed offset
+NTP_EPOCH = 2208988800  # 1900-01-01 → 1970-01-01, seconds
+CALENDAR_LEAD_MINUTES = 5  # calendar alarms fire this long before an event (calendar_lead in config.ini)
+CALENDAR_HORIZON = 14 * 86400  # s of occurrences expanded ahead; later ones on demand
+CALENDAR_LABEL_CHARS = 24  # event name shown in the next-event row
+CALENDAR_PRUNE = 256  # started occurrences dropped from the index in batches of at least this
+CALENDAR_POLL_MS = 500  # while hidden, how often to look for a finished calendar import
+CALENDAR_IDLE_PERIODS = 1000  # a recurrence with this many empty periods in a row is treated as ended
+INSTANCE_LOCK_FILE = "time_overlay.lock"  # held by the running overlay; holds its command port
+IPC_CONNECT_TIMEOUT = 3.0  # s a second launch waits for the first one to start listening
 VERSION = "1.27"  # ✅ version as constant
 
 # ✅ System alarm sound
-sound_path = os.path.join(os.environ['WINDIR'], 'Media', 'Alarm03.wav')
+sound_path = os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Media', 'Alarm03.wav')
+
+
+# ——— Config store (parsed once, write-behind) ————————————————————————————
+class ConfigStore:
+    def __init__(self, path, schedule=None, cancel=None, delay_ms=CONFIG_FLUSH_DELAY_MS):
+        self.path = path
+        self.schedule = schedule  # e.g. root.after
+        self.cancel = cancel      # e.g. root.after_cancel
+        self.delay_ms = delay_ms
+        self.config = configparser.ConfigParser(interpolation=None)  # '%' in alarm messages is literal
+        self.dirty = False
+        self.flush_job = None
+        self.writes = 0
+        self.pending = {}      # (section, key) → value, None = removed (key None: whole section); unflushed
+        self.listener = None   # called with {(section, key)} after an external edit was merged in
+        self.reloads = 0
+        self.stamp = self.disk_stamp()  # (mtime, size) as last read/written by us
+        if os.path.exists(path):
+            try:
+                self.config.read(path, encoding="utf-8")
+            except Exception as e:
+                print(f"⚠️ Config read error: {e}")
 
+    def __contains__(self, section):
+        return self.config.has_section(section)
 
-class ClockOverlay:
+    def items(self, section):
+        if not self.config.has_section(section):
+            return []
+        return [(key, self.config.get(section, key, raw=True)) for key in self.config.options(section)]
+
+    def get(self, section, key, fallback=None):
+        return self.config.get(section, key, raw=True, fallback=fallback)
+
+    def getint(self, section, key, fallback=None):
+        try:
+            return self.config.getint(section, key, raw=True, fallback=fallback)
+        except ValueError:
+            return fallback
+
+    def set(self, section, key, value):
+        value = str(value)
+        if not self.config.has_section(section):
+            self.config.add_section(section)
+        elif self.config.get(section, key, raw=True, fallback=None) == value:
+            return
+        self.config.set(section, key, value)
+        self.pending[(section, key)] = value
+        self.mark_dirty()
+
+    def remove(self, section, key):
+        if self.config.has_section(section) and self.config.remove_option(section, key):
+            self.pending[(section, key)] = None
+            self.mark_dirty()
+
+    def remove_section(self, section):
+        if self.config.remove_section(section):
+            self.pending[(section, None)] = None
+            self.mark_dirty()
+
+    # ——— External edits ———
+    def disk_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def check(self):
+        # ✅ One stat; the file is only re-read when mtime/size moved since our last read/write
+        stamp = self.disk_stamp()
+        if stamp == self.stamp or stamp is None:
+            return set()
+        return self.reload(stamp)
+
+    def reload(self, stamp):
+        disk = configparser.ConfigParser(interpolation=None)
+        try:
+            disk.read(self.path, encoding="utf-8")
+        except Exception as e:
+            print(f"⚠️ Config read error: {e}")
+            self.stamp = stamp  # don't re-read a broken file every tick
+            return set()
+        # Conflict rule: keys saved in-app but not flushed yet win; everything else comes from disk
+        for (section, key), value in self.pending.items():
+            if key is None:
+                disk.remove_section(section)
+            elif value is None:
+                if disk.has_section(section):
+                    disk.remove_option(section, key)
+            else:
+                if not disk.has_section(section):
+                    disk.add_section(section)
+                disk.set(section, key, value)
+        changed = config_diff(self.config, disk)
+        self.config = disk
+        self.stamp = stamp
+        self.reloads += 1
+        if changed and self.listener is not None:
+            self.listener(changed)
+        return changed
+
+    def mark_dirty(self):
+        self.dirty = True
+        if self.flush_job is None and self.schedule is not None:
+            self.flush_job = self.schedule(self.delay_ms, self.flush)
+
+    def flush(self):
+        if self.flush_job is not None and self.cancel is not None:
+            try:
+                self.cancel(self.flush_job)
+            except Exception:
+                pass
+        self.flush_job = None
+        if not self.dirty:
+            return
+        self.check()  # never write over an edit made while we were running
+        # ✅ Atomic write: temp file in the same dir, fsync, then rename over
+        directory = os.path.dirname(os.path.abspath(self.path))
+        import tempfile  # ✅ deferred: first write happens long after startup
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                self.config.write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+            self.writes += 1
+            self.pending.clear()
+            self.stamp = self.disk_stamp()
+        except Exception as e:
+            print(f"⚠️ Config write error: {e}")
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+
+def config_diff(old, new):
+    # {(section, key)} whose raw value differs between two ConfigParsers
+    changed = set()
+    for section in set(old.sections()) | set(new.sections()):
+        a = dict(old.items(section, raw=True)) if old.has_section(section) else {}
+        b = dict(new.items(section, raw=True)) if new.has_section(section) else {}
+        changed.update((section, key) for key in a.keys() | b.keys() if a.get(key) != b.get(key))
+    return changed
+
+
+class InotifyWatch:
+    # Linux only: readable when something in the config's directory was written or renamed
+    IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE = 0x008, 0x080, 0x100
+    IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.name = os.path.basename(path).encode()
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.path.dirname(os.path.abspath(path)).encode()
+        if libc.inotify_add_watch(self.fd, directory, self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def read(self):
+        # Drain queued events; True if one of them names the config file
+        hit = False
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                return hit
+            i = 0
+            while i + 16 <= len(data):  # struct inotify_event: wd, mask, cookie, len, name[len]
+                length = int.from_bytes(data[i + 12:i + 16], sys.byteorder)
+                if data[i + 16:i + 16 + length].rstrip(b"\0") == self.name:
+                    hit = True
+                i += 16 + length
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_config_watch(path):
+    # None → fall back to one stat per tick (Windows, no inotify)
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return InotifyWatch(path)
+    except (OSError, AttributeError) as e:
+        print(f"⚠️ inotify unavailable, polling config: {e}")
+        return None
+
+
+# ——— Drag controller (coalesced, frame-capped) ——————————————————————————
+class DragController:
+    def __init__(self, root, frame_ms=DRAG_FRAME_MS, snap=False):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.snap = snap
+        self.x = 0  # ✅ window position tracked locally, no winfo_* per event
+        self.y = 0
+        self.target = None
+        self.frame_job = None
+        self.geometry_calls = 0
+
+    def place(self, x, y):
+        self.x = int(x)
+        self.y = int(y)
+        self.root.geometry(f"+{self.x}+{self.y}")
+        self.geometry_calls += 1
+
+    def begin(self, x_root, y_root, width, height):
+        self.offset_x = x_root - self.x
+        self.offset_y = y_root - self.y
+        self.width = width
+        self.height = height
+        # Screen size is queried once per drag, not per event
+        self.screen_w = self.root.winfo_screenwidth()
+        self.screen_h = self.root.winfo_screenheight()
+
+    def motion(self, x_root, y_root):
+        # Only remember the latest pointer; the frame callback applies it
+        self.target = (x_root - self.offset_x, y_root - self.offset_y)
+        if self.frame_job is None:
+            self.frame_job = self.root.after(self.frame_ms, self.apply)
+
+    def apply(self):
+        self.frame_job = None
+        if self.target is None:
+            return
+        x, y = self.target
+        self.target = None
+        if self.snap:
+            x, y = self.snap_to_edges(x, y)
+        if x != self.x or y != self.y:
+            self.place(x, y)
+
+    def end(self):
+        if self.frame_job is not None:
+            try:
+                self.root.after_cancel(self.frame_job)
+            except Exception:
+                pass
+        self.apply()
+
+    def snap_to_edges(self, x, y):
+        right = self.screen_w - self.width
+        bottom = self.screen_h - self.height
+        if abs(x) <= SNAP_DISTANCE:
+            x = 0
+        elif abs(x - right) <= SNAP_DISTANCE:
+            x = right
+        if abs(y) <= SNAP_DISTANCE:
+            y = 0
+        elif abs(y - bottom) <= SNAP_DISTANCE:
+            y = bottom
+        return x, y
+
+
+# ——— Check menu (lazy build, incremental checkmark) ——————————————————————
+class CheckMenu:
+    def __init__(self, menu, values, command, fmt=str, current=None):
+        self.menu = menu
+        self.values = values
+        self.command = command
+        self.fmt = fmt
+        self.current = current
+        self.index_of = {value: i for i, value in enumerate(values)}
+        self.checked = None  # index of the entry currently showing ✓
+        self.built = False
+        # ✅ Entries are created the first time the cascade opens
+        menu.configure(postcommand=self.build)
+
+    def label(self, value, checked):
+        return f"{'✓ ' if checked else '  '}{self.fmt(value)}"
+
+    def build(self):
+        if self.built:
+            return
+        self.built = True
+        for value in self.values:
+            self.menu.add_command(
+                label=self.label(value, value == self.current),
+                command=partial(self.command, value)
+            )
+        self.checked = self.index_of.get(self.current)
+
+    def select(self, value):
+        self.current = value
+        if not self.built:
+            return
+        index = self.index_of.get(value)
+        if index == self.checked:
+            return
+        # ✅ Relabel only the old and the new entry
+        if self.checked is not None:
+            self.menu.entryconfig(self.checked, label=self.label(self.values[self.checked], False))
+        if index is not None:
+            self.menu.entryconfig(index, label=self.label(value, True))
+        self.checked = index
+
+
+# ——— Tick scheduler (monotonic, wakes on display boundaries) ————————————
+class TickScheduler:
+    def __init__(self, root, callback, resolution=60, wakeups=None, clock=None, lateness=None):
+        self.root = root
+        self.clock = clock or SystemClock()
+        self.wakeups = wakeups        # optional WakeupCounter
+        self.lateness = lateness      # optional LatencyHistogram
+        self.callback = callback      # called with the wall-clock datetime
+        self.resolution = resolution  # 60 → HH:MM, 1 → HH:MM:SS
+        self.job = None
+        self.target = None            # monotonic time the next tick is due
+        self.anchor = None            # wall − monotonic at the last tick
+        self.stops = 0                # bumped by stop(); a tick only re-arms if it wasn't stopped meanwhile
+        self.ticks = 0
+        self.jumps = 0
+
+    def start(self):
+        self.stop()
+        self.target = None
+        self.tick()
+
+    def stop(self):
+        self.stops += 1  # also covers a stop() from inside the callback, when no job is armed yet
+        if self.job is not None:
+            try:
+                self.root.after_cancel(self.job)
+            except Exception:
+                pass
+            self.job = None
+
+    def resync(self):
+        # ✅ Redraw now and re-anchor (resume, restore, resolution change)
+        self.start()
+
+    def set_resolution(self, resolution):
+        self.resolution = resolution
+        self.resync_if_running()
+
+    def resync_if_running(self):
+        if self.job is not None:
+            self.resync()
+
+    def tick(self):
+        self.job = None
+        if self.wakeups is not None:
+            self.wakeups.count()
+        mono = self.clock.monotonic()
+        wall = self.clock.time()
+        offset = wall - mono
+        jumped = self.anchor is not None and abs(offset - self.anchor) > TIME_JUMP_THRESHOLD
+        if jumped:
+            self.jumps += 1
+        elif self.target is not None:
+            if mono < self.target:
+                # after() fired early: sleep out the remainder, no redraw
+                self.arm_at(self.target, mono)
+                return
+            if self.lateness is not None:
+                self.lateness.record((mono - self.target) * 1000.0)
+        self.anchor = offset
+        self.ticks += 1
+        stops = self.stops
+        try:
+            self.callback(datetime.fromtimestamp(wall))
+        finally:
+            # ✅ Next boundary from the wall clock, slept on the monotonic clock; armed even if the callback
+            # raised, so one bad tick can't freeze the display, but not if the callback stopped the ticker
+            if self.job is None and self.stops == stops:
+                next_boundary = (math.floor(wall / self.resolution) + 1) * self.resolution
+                self.arm_at(mono + (next_boundary - wall), mono)
+
+    def arm_at(self, target, mono):
+        self.target = target
+        delay_ms = max(1, math.ceil((target - mono) * 1000))
+        self.job = self.root.after(delay_ms, self.tick)
+
+
+class WakeupCounter:
+    # Timer wakeups per display state ("shown" / "hidden"), for wakeups/hour
+    def __init__(self):
+        self.counts = {}
+        self.seconds = {}
+        self.state = None
+        self.since = time.monotonic()
+
+    def enter(self, state):
+        now = time.monotonic()
+        if self.state is not None:
+            self.seconds[self.state] = self.seconds.get(self.state, 0.0) + now - self.since
+        self.state = state
+        self.since = now
+
+    def count(self):
+        self.counts[self.state] = self.counts.get(self.state, 0) + 1
+
+    def per_hour(self, state):
+        seconds = self.seconds.get(state, 0.0)
+        if state == self.state:
+            seconds += time.monotonic() - self.since
+        return self.counts.get(state, 0) * 3600.0 / seconds if seconds > 0 else 0.0
+
+
+# ——— Latency histograms (fixed buckets, updated in place) ————————————————
+class LatencyHistogram:
+    __slots__ = ("name", "bounds", "counts", "count", "total_ms", "max_ms")
+
+    def __init__(self, name, bounds=STATS_BUCKETS_MS):
+        self.name = name
+        self.bounds = bounds                     # bucket upper bounds, ms
+        self.counts = [0] * (len(bounds) + 1)    # last bucket: above bounds[-1]
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        # ✅ Hot path: one bisect and a few in-place updates, no new containers
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def percentile(self, p):
+        # Upper bound of the bucket holding the p-th percentile (max for the overflow bucket)
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100.0)
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return float(self.bounds[i]) if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        if not self.count:
+            return f"{self.name}: no samples"
+        return (f"{self.name}: n={self.count} mean {self.total_ms / self.count:.1f} "
+                f"p50≤{self.percentile(50):.0f} p99≤{self.percentile(99):.0f} max {self.max_ms:.0f} ms")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "buckets_ms": list(self.bounds),
+            "counts": list(self.counts),
+        }
+
+
+class TickStats:
+    # Scheduling lateness at boundary ticks, render cost, alarm delivery delay
+    def __init__(self):
+        self.lateness = LatencyHistogram("Tick lateness")
+        self.render = LatencyHistogram("Render")
+        self.alarm_delay = LatencyHistogram("Alarm delay")
+        self.histograms = (self.lateness, self.render, self.alarm_delay)
+
+    def reset(self):
+        for histogram in self.histograms:
+            histogram.reset()
+
+    def text(self):
+        return "\n".join(histogram.summary() for histogram in self.histograms)
+
+    def to_json(self, extra=None):
+        data = {
+            "version": VERSION,
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "lateness": self.lateness.snapshot(),
+            "render": self.render.snapshot(),
+            "alarm_delay": self.alarm_delay.snapshot(),
+        }
+        data.update(extra or {})
+        return json.dumps(data, indent=2)
+
+    def export(self, path, extra=None):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json(extra))
+
+
+class LocalServer:
+    # 127.0.0.1 only, one short connection at a time; handle(conn) runs on the server thread
+    name = "local-server"
+
+    def __init__(self, handle, port=0):
+        self.handle = handle
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if os.name != "nt":  # rebind past TIME_WAIT after a reload; on Windows this would allow port stealing
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", port))
+        self.sock.listen(4)
+        self.port = self.sock.getsockname()[1]
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return  # closed
+            try:
+                with conn:
+                    conn.settimeout(2.0)
+                    self.handle(conn)
+            except Exception as e:
+                print(f"⚠️ {self.name} client failed: {e}")
+
+    def close(self):
+        # shutdown() wakes the thread blocked in accept(); close() alone leaves the port bound on Linux
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Windows: not connected (closesocket() wakes accept() there)
+        self.sock.close()
+        if self.thread is not None:
+            self.thread.join(1.0)
+
+
+class StatsServer(LocalServer):
+    # Every connection gets one JSON snapshot, then is closed
+    name = "stats-server"
+
+    def __init__(self, port, snapshot):
+        super().__init__(self.send_snapshot, port)
+        self.snapshot = snapshot  # () -> str, called on the server thread
+
+    def send_snapshot(self, conn):
+        conn.sendall(self.snapshot().encode("utf-8"))
+
+
+# ——— Time-zone rows (offset cached until the next transition) ——————————————
+class ZoneClock:
+    __slots__ = ("label", "tz", "offset", "valid_from", "valid_until", "refreshes")
+
+    def __init__(self, label, tz=None):
+        self.label = label
+        self.tz = tz             # None → system local time
+        self.offset = 0          # seconds east of UTC
+        self.valid_from = math.inf
+        self.valid_until = -math.inf
+        self.refreshes = 0
+
+    def offset_at(self, ts):
+        if self.tz is None:
+            return time.localtime(ts).tm_gmtoff
+        return int(datetime.fromtimestamp(ts, self.tz).utcoffset().total_seconds())
+
+    def refresh(self, ts):
+        # ✅ Once per transition: day steps to the next change, then bisect to the second
+        self.refreshes += 1
+        self.offset = self.offset_at(ts)
+        lo, hi = ts, None
+        for day in range(1, ZONE_SCAN_DAYS + 1):
+            probe = ts + day * 86400
+            if self.offset_at(probe) != self.offset:
+                hi = probe
+                break
+            lo = probe
+        if hi is not None:
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if self.offset_at(mid) == self.offset:
+                    lo = mid
+                else:
+                    hi = mid
+        self.valid_from = ts
+        self.valid_until = hi if hi is not None else lo
+
+    def text(self, ts, seconds=False):
+        # ✅ Plain addition + integer math, no tz lookup per tick
+        if not (self.valid_from <= ts < self.valid_until):
+            self.refresh(int(ts))
+        t = int(ts) + self.offset
+        clock = f"{t // 3600 % 24:02d}:{t // 60 % 60:02d}"
+        if seconds:
+            clock += f":{t % 60:02d}"
+        return f"{self.label} {clock}" if self.label else clock
+
+    def template(self, seconds=False):
+        # Widest text this row can show (window sizing)
+        clock = "00:00:00" if seconds else "00:00"
+        return f"{self.label} {clock}" if self.label else clock
+
+
+def parse_zones(spec):
+    # "UTC, EU=Europe/Berlin" → [ZoneClock("UTC", utc), ZoneClock("EU", Berlin)]
+    rows = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        label, _, name = item.rpartition("=")
+        name = name.strip()
+        label = label.strip() or name.rsplit("/", 1)[-1].replace("_", " ")
+        try:
+            tz = timezone.utc if name.upper() == "UTC" else ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            print(f"⚠️ Unknown time zone {name!r} (install tzdata?): {e}")
+            continue
+        rows.append(ZoneClock(label, tz))
+    return rows
+
+
+# ——— Countdowns (hierarchical timer wheel) ——————————————————————————————
+class TimerWheel:
+    # WHEEL_SLOTS slots per level, 1 s resolution: level n spans 64**(n+1) seconds
+    def __init__(self, now):
+        self.current = int(now)
+        self.wheels = [[[] for _ in range(WHEEL_SLOTS)] for _ in range(WHEEL_LEVELS)]
+        self.ready = []
+        self.count = 0
+
+    def add(self, expire, item):
+        expire = int(math.ceil(expire))
+        delta = expire - self.current
+        self.count += 1
+        if delta <= 0:
+            self.ready.append((expire, item))
+            return
+        level = 0
+        while level < WHEEL_LEVELS - 1 and delta >= WHEEL_SLOTS ** (level + 1):
+            level += 1
+        slot = (expire // WHEEL_SLOTS ** level) % WHEEL_SLOTS
+        self.wheels[level][slot].append((expire, item))
+
+    def advance(self, now):
+        # Returns items whose expiry is ≤ now; O(1) per elapsed second
+        now = int(now)
+        if now < self.current or now - self.current > WHEEL_SLOTS ** 2:
+            self.rebuild(now)  # clock stepped back or long sleep: re-file everything
+        while self.current < now:
+            self.current += 1
+            for level in range(1, WHEEL_LEVELS):
+                span = WHEEL_SLOTS ** level
+                if self.current % span:
+                    break
+                self.cascade(level, (self.current // span) % WHEEL_SLOTS)
+            self.cascade(0, self.current % WHEEL_SLOTS)
+        fired = [item for _, item in self.ready]
+        self.count -= len(fired)
+        self.ready = []
+        return fired
+
+    def cascade(self, level, slot):
+        entries = self.wheels[level][slot]
+        if entries:
+            self.wheels[level][slot] = []
+            self.count -= len(entries)
+            for expire, item in entries:
+                self.add(expire, item)
+
+    def rebuild(self, now):
+        entries = [entry for wheel in self.wheels for slot in wheel for entry in slot]
+        self.wheels = [[[] for _ in range(WHEEL_SLOTS)] for _ in range(WHEEL_LEVELS)]
+        self.current = now
+        self.count = len(self.ready)
+        for expire, item in entries:
+            self.add(expire, item)
+
+
+class Countdown:
+    # [countdowns] value: repeat|HH:MM|zone|label, repeat = daily or every:N (minutes)
+    __slots__ = ("label", "prefix", "hour", "minute", "repeat", "interval", "tz", "next_ts")
+
+    def __init__(self, label, hour, minute, repeat="daily", interval=60, tz=None):
+        self.label = label
+        self.prefix = f"{label} in"
+        self.hour = hour
+        self.minute = minute
+        self.repeat = repeat
+        self.interval = interval
+        self.tz = tz         # None → local time
+        self.next_ts = None
+
+    @classmethod
+    def from_spec(cls, spec):
+        repeat, when, zone, label = spec.split("|", 3)
+        interval = 60
+        if repeat.startswith("every:"):
+            repeat, interval = "every", max(1, int(repeat[6:]))
+        if repeat not in ("daily", "every"):
+            raise ValueError(f"unknown repeat {repeat!r}")
+        hour, minute = (int(part) for part in when.split(":"))
+        if not (0 <= hour <= 23 and 0 <= minute <= 59):
+            raise ValueError(f"bad time {when!r}")
+        zone = zone.strip()
+        try:
+            tz = None if zone.lower() in ("", "local") else timezone.utc if zone.upper() == "UTC" else ZoneInfo(zone)
+        except ZoneInfoNotFoundError as e:
+            raise ValueError(f"unknown time zone {zone!r}") from e
+        return cls(label.strip() or "Event", hour, minute, repeat, interval, tz)
+
+    def next_after(self, ts):
+        now = datetime.fromtimestamp(ts, self.tz)
+        base = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if self.repeat == "every":
+            step = timedelta(minutes=self.interval)
+            return (base + step * ((now - base) // step + 1)).timestamp()
+        if base <= now:
+            base += timedelta(days=1)
+        return base.timestamp()
+
+    def text(self, ts, seconds=False):
+        left = max(0, math.ceil(self.next_ts - ts)) if self.next_ts is not None else 0
+        if seconds:
+            return f"{self.prefix} {left // 3600}:{left // 60 % 60:02d}:{left % 60:02d}"
+        left = (left + 59) // 60
+        return f"{self.prefix} {left // 60}:{left % 60:02d}"
+
+    def template(self, seconds=False):
+        return f"{self.prefix} 00:00:00" if seconds else f"{self.prefix} 00:00"
+
+
+class CountdownBoard:
+    def __init__(self, countdowns, now):
+        self.countdowns = countdowns
+        self.wheel = TimerWheel(now)
+        for countdown in countdowns:
+            self.schedule(countdown, now)
+
+    def schedule(self, countdown, now):
+        countdown.next_ts = countdown.next_after(now)
+        self.wheel.add(countdown.next_ts, countdown)
+
+    def advance(self, now):
+        # ✅ Only events that just reached zero are rescheduled
+        for countdown in self.wheel.advance(now):
+            self.schedule(countdown, now)
+
+
+# ——— Stopwatch / timer (perf_counter, tenths of a second) ——————————————————
+class Stopwatch:
+    # Counts up, or down from `duration`; only runs while started
+    __slots__ = ("timer", "prefix", "running", "started", "elapsed", "duration", "shown_second", "shown_head")
+
+    def __init__(self, timer=time.perf_counter):
+        self.timer = timer
+        self.prefix = "⏱"
+        self.running = False
+        self.started = 0.0
+        self.elapsed = 0.0    # accumulated before the current run
+        self.duration = None  # seconds → countdown mode
+        self.shown_second = None
+        self.shown_head = ""
+
+    def start(self):
+        if not self.running and not self.finished():
+            self.started = self.timer()
+            self.running = True
+
+    def pause(self):
+        if self.running:
+            self.elapsed += self.timer() - self.started
+            self.running = False
+
+    def toggle(self):
+        self.pause() if self.running else self.start()
+
+    def reset(self, duration=None):
+        self.running = False
+        self.elapsed = 0.0
+        self.duration = duration
+
+    def value(self):
+        elapsed = self.elapsed + (self.timer() - self.started if self.running else 0.0)
+        if self.duration is None:
+            return elapsed
+        return max(0.0, self.duration - elapsed)
+
+    def finished(self):
+        return self.duration is not None and self.elapsed >= self.duration
+
+    def check_finished(self):
+        # Countdown reached zero: stop on exactly 0.0 and report it once
+        if self.running and self.duration is not None and self.value() <= 0.0:
+            self.elapsed = self.duration
+            self.running = False
+            return True
+        return False
+
+    def tenths(self):
+        # Count-up floors, countdown ceils: the display never shows 0.0 early
+        value = self.value() * 10
+        return math.floor(value) if self.duration is None else math.ceil(value - 1e-9)
+
+    def ms_to_change(self):
+        value = self.value() * 10
+        if self.duration is None:
+            return (math.floor(value) + 1 - value) * 100.0
+        return (value - (math.ceil(value - 1e-9) - 1)) * 100.0
+
+    def text(self, ts=None, seconds=False):
+        # ✅ Only the tenth digit changes per frame; "MM:SS" is rebuilt once a second from MMSS_TEXT
+        second, tenth = divmod(self.tenths(), 10)
+        if second != self.shown_second:
+            hours, rest = divmod(second, 3600)
+            self.shown_head = f"{self.prefix} {hours}:{MMSS_TEXT[rest]}." if hours else f"{self.prefix} {MMSS_TEXT[rest]}."
+            self.shown_second = second
+        return self.shown_head + "0123456789"[tenth]
+
+    def template(self, seconds=False):
+        return f"{self.prefix} 0:00:00.0" if self.value() >= 3600 else f"{self.prefix} 00:00.0"
+
+
+# ——— Alarm engine (heap keyed by next fire time) ——————————————————————————
+class Alarm:
+    REPEATS = ("once", "daily", "weekdays", "every")
+    __slots__ = ("id", "hour", "minute", "message", "repeat", "interval", "at", "enabled", "sound",
+                 "persistent", "next_fire", "due_at", "generation")
+
+    def __init__(self, alarm_id, hour, minute, message, repeat="daily", interval=60, at=None, enabled=True):
+        self.id = alarm_id
+        self.hour = hour
+        self.minute = minute
+        self.message = message
+        self.repeat = repeat
+        self.interval = interval  # minutes, for repeat == "every"
+        self.at = at              # full datetime, for repeat == "once"
+        self.enabled = enabled
+        self.sound = ""           # WAV path; empty → default alarm sound
+        self.persistent = True    # False → never written to [alarms] (snoozes)
+        self.next_fire = None
+        self.due_at = None        # slot the last firing was for (alarm-delay stats)
+        self.generation = 0       # bumped on reschedule; stale heap entries are skipped
+
+    def next_after(self, now):
+        if self.repeat == "once":
+            return self.at  # may be in the past → caught up on the next tick
+        base = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if self.repeat == "every":
+            step = timedelta(minutes=max(1, self.interval))
+            return base + step * ((now - base) // step + 1)
+        if base <= now:
+            base += timedelta(days=1)
+        if self.repeat == "weekdays":
+            while base.weekday() >= 5:
+                base += timedelta(days=1)
+        return base
+
+    def last_at_or_before(self, now):
+        # Latest slot of a recurring alarm that is not after `now`
+        base = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if self.repeat == "every":
+            step = timedelta(minutes=max(1, self.interval))
+            return base + step * ((now - base) // step)
+        if base > now:
+            base -= timedelta(days=1)
+        if self.repeat == "weekdays":
+            while base.weekday() >= 5:
+                base -= timedelta(days=1)
+        return base
+
+    # [alarms] value: enabled|repeat|when|message
+    def to_spec(self):
+        repeat = f"every:{self.interval}" if self.repeat == "every" else self.repeat
+        if self.repeat == "once" and self.at is not None:
+            when = self.at.strftime("%Y-%m-%d %H:%M")
+        else:
+            when = f"{self.hour:02d}:{self.minute:02d}"
+        return f"{int(self.enabled)}|{repeat}|{when}|{self.message}"
+
+    @classmethod
+    def from_spec(cls, alarm_id, spec, now):
+        enabled, repeat, when, message = spec.split("|", 3)
+        interval = 60
+        if repeat.startswith("every:"):
+            repeat, interval = "every", int(repeat[6:])
+        if repeat not in cls.REPEATS:
+            raise ValueError(f"unknown repeat {repeat!r}")
+        at = None
+        if " " in when:
+            at = datetime.strptime(when, "%Y-%m-%d %H:%M")
+            hour, minute = at.hour, at.minute
+        else:
+            hour, minute = (int(part) for part in when.split(":"))
+            if not (0 <= hour <= 23 and 0 <= minute <= 59):
+                raise ValueError(f"bad time {when!r}")
+        alarm = cls(alarm_id, hour, minute, message.strip() or "Alarm!", repeat, interval, at, enabled.strip() == "1")
+        if repeat == "once" and at is None:
+            alarm.at = alarm.next_time_of_day(now)
+        return alarm
+
+    def next_time_of_day(self, now):
+        at = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        return at if at > now else at + timedelta(days=1)
+
+
+class AlarmEngine:
+    def __init__(self):
+        self.alarms = {}
+        self.heap = []  # (next_fire, seq, generation, alarm)
+        self.seq = 0
+        self.stale = 0
+
+    def __len__(self):
+        return len(self.alarms)
+
+    def add(self, alarm, now):
+        if alarm.id in self.alarms:
+            self.remove(alarm.id)
+        self.alarms[alarm.id] = alarm
+        self.schedule(alarm, now)
+
+    def remove(self, alarm_id):
+        alarm = self.alarms.pop(alarm_id, None)
+        if alarm is not None and alarm.next_fire is not None:
+            alarm.generation += 1
+            alarm.next_fire = None
+            self.stale += 1
+        return alarm
+
+    def schedule(self, alarm, now):
+        if alarm.next_fire is not None:
+            self.stale += 1
+        alarm.generation += 1
+        alarm.next_fire = alarm.next_after(now) if alarm.enabled else None
+        if alarm.next_fire is not None:
+            self.seq += 1
+            heapq.heappush(self.heap, (alarm.next_fire, self.seq, alarm.generation, alarm))
+        # ✅ Compact once dead entries outnumber live ones
+        if self.stale > 64 and self.stale > len(self.heap) // 2:
+            self.heap = [entry for entry in self.heap if entry[2] == entry[3].generation]
+            heapq.heapify(self.heap)
+            self.stale = 0
+
+    def next_fire(self):
+        while self.heap and self.heap[0][2] != self.heap[0][3].generation:
+            heapq.heappop(self.heap)
+            self.stale -= 1
+        return self.heap[0][0] if self.heap else None
+
+    def due(self, now):
+        # ✅ O(1) when nothing is due: a single look at the heap top
+        fired = []
+        while self.heap and self.heap[0][0] <= now:
+            when, _, generation, alarm = heapq.heappop(self.heap)
+            if generation != alarm.generation:
+                self.stale -= 1
+                continue
+            alarm.next_fire = None
+            if alarm.repeat != "once":
+                when = max(when, alarm.last_at_or_before(now))  # slept through several slots: judge the latest
+            alarm.due_at = when
+            # Missed while asleep: fire once on wake unless too old
+            if now - when <= ALARM_CATCHUP_LIMIT:
+                fired.append(alarm)
+            if alarm.repeat == "once":
+                alarm.enabled = False
+            else:
+                self.schedule(alarm, now)  # one catch-up, not one per missed slot
+        return fired
+
+
+# ——— Calendar import (streaming ICS, lazy RRULE, bisect index) ——————————————
+ICS_FIELDS = {"UID", "SUMMARY", "DTSTART", "RRULE", "RECURRENCE-ID", "STATUS"}
+ICS_KEEP = ICS_FIELDS | {"BEGIN", "END", "EXDATE"}
+ICS_WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+ICS_RRULE_PARTS = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "BYMONTHDAY", "WKST"}
+
+
+def ics_lines(f):
+    # Unfolded content lines from a text stream; only the current line is held in memory
+    current = None
+    for raw in f:
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t") and current is not None:
+            current += raw[1:]
+            continue
+        if current:
+            yield current
+        current = raw
+    if current:
+        yield current
+
+
+def ics_property(line):
+    # "DTSTART;TZID=Europe/Berlin:20260301T200000" → ("DTSTART", {"TZID": "Europe/Berlin"}, "20260301T200000")
+    head, sep, value = line.partition(":")
+    if '"' in head:  # quoted parameter values may contain ':'
+        quoted = False
+        for i, ch in enumerate(line):
+            if ch == '"':
+                quoted = not quoted
+            elif ch == ":" and not quoted:
+                head, sep, value = line[:i], ":", line[i + 1:]
+                break
+        else:
+            return None
+    if not sep:
+        return None
+    name, *params = head.split(";")
+    return name.upper(), {k.upper(): v.strip('"') for k, _, v in (p.partition("=") for p in params)}, value
+
+
+def ics_events(f):
+    # VEVENTs as {property: (params, value)}; EXDATE collects a list; nested blocks (VALARM) are skipped
+    event = None
+    depth = 0
+    for line in ics_lines(f):
+        # ✅ Name first: DESCRIPTION, DTSTAMP, LOCATION… are dropped without parsing their parameters
+        if line.split(":", 1)[0].split(";", 1)[0].upper() not in ICS_KEEP:
+            continue
+        prop = ics_property(line)
+        if prop is None:
+            continue
+        name, params, value = prop
+        if name == "BEGIN":
+            if event is not None:
+                depth += 1
+            elif value.upper() == "VEVENT":
+                event = {}
+        elif name == "END":
+            if event is not None:
+                if depth:
+                    depth -= 1
+                elif value.upper() == "VEVENT":
+                    yield event
+                    event = None
+        elif event is not None and not depth:
+            if name == "EXDATE":
+                event.setdefault("EXDATE", []).append((params, value))
+            elif name in ICS_FIELDS:
+                event[name] = (params, value)
+
+
+def ics_text(value):
+    return (value.replace("\\n", " ").replace("\\N", " ").replace("\\,", ",")
+            .replace("\\;", ";").replace("\\\\", "\\").strip())
+
+
+def ics_time(params, value):
+    # → datetime: aware for UTC and known TZIDs, naive (local) for floating times and all-day dates
+    # (sliced by hand: strptime was most of an import's time)
+    value = value.strip()
+    if len(value) < 8 or not value[:8].isdigit():
+        raise ValueError(f"bad date {value!r}")
+    date = (int(value[:4]), int(value[4:6]), int(value[6:8]))
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime(*date)
+    if len(value) not in (15, 16) or value[8] != "T" or not value[9:15].isdigit():
+        raise ValueError(f"bad date-time {value!r}")
+    at = datetime(*date, int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    if value.endswith("Z"):
+        return at.replace(tzinfo=timezone.utc)
+    tzid = params.get("TZID")
+    if tzid:
+        try:
+            return at.replace(tzinfo=ZoneInfo(tzid))
+        except (ZoneInfoNotFoundError, ValueError):
+            pass  # Windows zone names ("W. Europe Standard Time") → local time
+    return at
+
+
+def parse_rrule(text):
+    # "FREQ=WEEKLY;BYDAY=TU,TH;COUNT=10" → typed rule; ValueError for malformed values, so a bad event is
+    # skipped at import instead of failing mid-expansion
+    parts = dict(part.partition("=")[::2] for part in text.upper().split(";") if part)
+    rule = {
+        "freq": parts.get("FREQ"),
+        "interval": int(parts.get("INTERVAL", 1)),
+        "count": int(parts["COUNT"]) if "COUNT" in parts else None,
+        "until": ics_time({}, parts["UNTIL"]).timestamp() if "UNTIL" in parts else None,
+        "weekdays": None,
+        "monthdays": None,
+    }
+    if rule["interval"] < 1 or (rule["count"] is not None and rule["count"] < 0):
+        raise ValueError(f"bad RRULE {text!r}")
+    ordinal = False
+    if parts.get("BYDAY"):
+        days = parts["BYDAY"].split(",")
+        if any(day[-2:] not in ICS_WEEKDAYS or (day[:-2] and not day[:-2].lstrip("+-").isdigit()) for day in days):
+            raise ValueError(f"bad BYDAY {parts['BYDAY']!r}")
+        ordinal = any(len(day) != 2 for day in days)
+        rule["weekdays"] = sorted({ICS_WEEKDAYS[day[-2:]] for day in days})
+    if parts.get("BYMONTHDAY"):
+        rule["monthdays"] = [int(day) for day in parts["BYMONTHDAY"].split(",")]
+        if not all(1 <= abs(day) <= 31 for day in rule["monthdays"]):
+            raise ValueError(f"bad BYMONTHDAY {parts['BYMONTHDAY']!r}")
+    # Unsupported rules (BYSETPOS, "2MO", HOURLY…) keep their first occurrence only
+    rule["supported"] = (rule["freq"] in ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+                         and not set(parts) - ICS_RRULE_PARTS and not ordinal)
+    return rule
+
+
+def rrule_dates(start, rule, after=None):
+    # Candidate starts of a recurring event (rule from parse_rrule) in order, lazily; periods are stepped
+    # in the event's own zone, so 20:00 stays 20:00 across DST. `after` (timestamp) skips whole periods before it.
+    yield start
+    if not rule["supported"]:
+        return
+    freq = rule["freq"]
+    interval = rule["interval"]
+    weekdays = rule["weekdays"]
+    monthdays = rule["monthdays"]
+    k = 0
+    if after is not None and rule["count"] is None:  # COUNT needs every occurrence from DTSTART
+        days = (datetime.fromtimestamp(after, start.tzinfo).replace(tzinfo=None) - start.replace(tzinfo=None)).days
+        period = {"DAILY": 1, "WEEKLY": 7, "MONTHLY": 31, "YEARLY": 366}[freq] * interval  # never overshoots
+        k = max(0, days // period - 1)
+    idle = 0
+    while idle < CALENDAR_IDLE_PERIODS:  # a rule that can never match (BYMONTHDAY=30 in February) ends
+        if freq == "DAILY":
+            at = start + timedelta(days=k * interval)
+            candidates = [at] if (weekdays is None or at.weekday() in weekdays) and (
+                monthdays is None or at.day in monthdays) else []
+        elif freq == "WEEKLY":
+            week = start - timedelta(days=start.weekday()) + timedelta(weeks=k * interval)
+            candidates = [week + timedelta(days=day) for day in (weekdays or [start.weekday()])]
+        elif freq == "MONTHLY":
+            year, month = divmod(start.month - 1 + k * interval, 12)
+            year += start.year
+            month += 1
+            length = (datetime(year + month // 12, month % 12 + 1, 1) - datetime(year, month, 1)).days
+            if weekdays is not None:
+                days = [d for d in range(1, length + 1) if datetime(year, month, d).weekday() in weekdays]
+            else:
+                days = sorted(d if d > 0 else length + 1 + d for d in (monthdays or [start.day]))
+            candidates = [start.replace(year=year, month=month, day=d) for d in days if 1 <= d <= length]
+        else:
+            try:
+                candidates = [start.replace(year=start.year + k * interval)]
+            except ValueError:
+                candidates = []  # 29 February
+        k += 1
+        candidates = [at for at in candidates if at > start]
+        idle = 0 if candidates else idle + 1
+        yield from candidates
+
+
+def ics_occurrences(start, rule, skip, after=None):
+    # Start timestamps of one event, in order; COUNT/UNTIL end it, EXDATEs and overridden instances are skipped
+    count = rule["count"] if rule else None
+    until = rule["until"] if rule else None
+    for n, at in enumerate(rrule_dates(start, rule, after) if rule else (start,)):
+        if count is not None and n >= count:
+            return
+        ts = at.timestamp()
+        if until is not None and ts > until:
+            return
+        if ts not in skip:
+            yield ts
+
+
+class CalendarIndex:
+    # Upcoming occurrences as parallel sorted lists (start timestamps, (start, summary)), expanded lazily
+    # up to a horizon from a heap of per-event generators; every lookup is a bisect
+    def __init__(self, now, horizon=CALENDAR_HORIZON):
+        self.starts = []
+        self.events = []
+        self.pending = []  # (next start, seq, summary, generator)
+        self.horizon = horizon
+        self.filled_until = now
+        self.alerted = now  # events starting up to here have alerted (or had started before the import)
+        self.imported = 0
+        self.skipped = 0
+
+    @classmethod
+    def load(cls, f, now, horizon=CALENDAR_HORIZON):
+        # ✅ Streaming: one VEVENT at a time; recurring events stay generators until needed
+        index = cls(now, horizon)
+        expansions = []
+        overridden = {}  # UID → original starts replaced by a RECURRENCE-ID instance (or cancelled)
+        for event in ics_events(f):
+            try:
+                params, value = event["DTSTART"]
+                start = ics_time(params, value)
+                uid = event.get("UID", ({}, ""))[1]
+                skip = overridden.setdefault(uid, set()) if uid else set()
+                if "RECURRENCE-ID" in event:
+                    skip.add(ics_time(*event["RECURRENCE-ID"]).timestamp())
+                    skip = set()
+                if event.get("STATUS", ({}, ""))[1].upper() == "CANCELLED":
+                    continue
+                rule = None
+                if "RRULE" in event and "RECURRENCE-ID" not in event:
+                    rule = parse_rrule(event["RRULE"][1])
+                for params, value in event.get("EXDATE", ()):
+                    skip.update(ics_time(params, v).timestamp() for v in value.split(","))
+            except (KeyError, ValueError):
+                index.skipped += 1
+                continue
+            summary = ics_text(event.get("SUMMARY", ({}, ""))[1]) or "Event"
+            expansions.append((summary, ics_occurrences(start, rule, skip, after=now)))
+        # Overrides may follow their series in the file, so expansion starts once all are known
+        for summary, occurrences in expansions:
+            index.push(summary, occurrences, now)
+        index.imported = len(expansions)
+        heapq.heapify(index.pending)
+        index.fill(now + horizon)
+        return index
+
+    def push(self, summary, occurrences, after):
+        for ts in occurrences:
+            if ts >= after:
+                self.pending.append((ts, len(self.pending), summary, occurrences))
+                return
+
+    def fill(self, until):
+        # ✅ Expands only up to `until`: a weekly event adds one entry per week of horizon
+        pending = self.pending
+        while pending and pending[0][0] <= until:
+            ts, seq, summary, occurrences = pending[0]
+            self.starts.append(ts)
+            self.events.append((ts, summary))
+            following = next(occurrences, None)
+            if following is None:
+                heapq.heappop(pending)
+            else:
+                heapq.heapreplace(pending, (following, seq, summary, occurrences))
+        self.filled_until = max(self.filled_until, until)
+
+    def ensure(self, ts):
+        if ts > self.filled_until:
+            self.fill(ts + self.horizon)
+
+    def next_event(self, ts):
+        # First occurrence starting after ts → (start, summary) or None; O(log n)
+        self.ensure(ts)
+        i = bisect.bisect_right(self.starts, ts)
+        if i == len(self.starts) and self.pending:
+            self.fill(self.pending[0][0])  # beyond the horizon: expand just up to the next one
+        return self.events[i] if i < len(self.events) else None
+
+    def between(self, start, end):
+        # Occurrences with start <= t < end, in order
+        self.ensure(end)
+        return self.events[bisect.bisect_left(self.starts, start):bisect.bisect_left(self.starts, end)]
+
+    def due(self, ts, lead=0.0):
+        # Occurrences whose alert time (start - lead) passed and that have not alerted yet; too-old ones
+        # are dropped. The cursor is a start time, so an event a few minutes after an import still alerts.
+        self.ensure(ts + lead)
+        starts = self.starts
+        fired = []
+        if ts + lead > self.alerted:
+            i = bisect.bisect_right(starts, self.alerted)
+            j = bisect.bisect_right(starts, ts + lead)
+            limit = ALARM_CATCHUP_LIMIT.total_seconds()
+            fired = [event for event in self.events[i:j] if ts - (event[0] - lead) <= limit]
+            self.alerted = ts + lead
+        # Forget what has started; the lists only hold the horizon
+        past = bisect.bisect_right(starts, min(ts, self.alerted))
+        if past > CALENDAR_PRUNE:
+            del starts[:past]
+            del self.events[:past]
+        return fired
+
+    def next_alert(self, lead=0.0):
+        event = self.next_event(self.alerted)
+        return event[0] - lead if event is not None else None
+
+
+class CalendarFile:
+    # A .ics path, re-imported only when its content hash changes; (mtime, size) decides when to hash.
+    # Hashing and parsing run on a worker thread; check() hands over the result on the Tk thread.
+    def __init__(self, path):
+        self.path = path
+        self.stamp = None
+        self.digest = None
+        self.imports = 0
+        self.index = None
+        self.loaded = None  # CalendarIndex set by the worker, taken by check()
+        self.thread = None
+
+    def check(self, now, wait=False):
+        # → a fresh CalendarIndex once one is ready, else None
+        if self.loaded is not None:
+            index = self.loaded
+            self.loaded = None
+            self.index = index
+            self.imports += 1
+            return index
+        if self.thread is not None and self.thread.is_alive():
+            return None
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError as e:
+            if self.stamp != "missing":
+                print(f"⚠️ Calendar {self.path!r}: {e.strerror or e}")
+                self.stamp = "missing"
+            return None
+        if stamp == self.stamp:
+            return None
+        self.stamp = stamp
+        self.thread = threading.Thread(target=self.load, args=(now,), name="calendar-import", daemon=True)
+        self.thread.start()
+        if wait:
+            self.thread.join()
+            return self.check(now)
+        return None
+
+    def load(self, now):
+        try:
+            digest = hashlib.sha1()
+            with open(self.path, "rb") as f:
+                for block in iter(partial(f.read, 1 << 16), b""):
+                    digest.update(block)
+            if digest.digest() == self.digest:
+                return  # touched or rewritten with the same content
+            with open(self.path, encoding="utf-8-sig", errors="replace", newline="") as f:
+                index = CalendarIndex.load(f, now)
+        except OSError as e:
+            print(f"⚠️ Calendar {self.path!r}: {e.strerror or e}")
+            return
+        self.digest = digest.digest()
+        self.loaded = index
+
+    def busy(self):
+        # An import is running or waiting to be picked up by check()
+        return self.loaded is not None or (self.thread is not None and self.thread.is_alive())
+
+    def status(self):
+        name = os.path.basename(self.path)
+        if self.index is None:
+            return f"Calendar {name}: not loaded"
+        text = f"Calendar {name}: {self.index.imported} events, {len(self.index.starts)} upcoming"
+        return f"{text} ({self.index.skipped} skipped)" if self.index.skipped else text
+
+
+class CalendarRow(Countdown):
+    # Countdown to the calendar's next event; the label follows the event
+    __slots__ = ("calendar", "event")
+
+    def __init__(self):
+        super().__init__("No events", 0, 0)
+        self.prefix = self.label
+        self.calendar = None  # CalendarIndex
+        self.event = None
+
+    def text(self, ts, seconds=False):
+        event = self.calendar.next_event(ts) if self.calendar is not None else None
+        if event is not self.event:
+            self.event = event
+            self.prefix = f"{event[1][:CALENDAR_LABEL_CHARS]} in" if event else self.label
+            self.next_ts = event[0] if event else None
+        return super().text(ts, seconds) if event else self.prefix
+
+    def template(self, seconds=False):
+        return f"{self.prefix} 000:00:00" if seconds else f"{self.prefix} 000:00"
+
+
+# ——— Global hotkeys (input thread → queue → Tk loop) ——————————————————————
+class KeyboardHotkeyBackend:
+    # `keyboard` runs one long-lived listener thread; callbacks fire on it
+    def __init__(self):
+        import keyboard  # ✅ for global hotkey
+        self.keyboard = keyboard
+
+    def add(self, hotkey, callback):
+        return self.keyboard.add_hotkey(hotkey, callback)
+
+    def remove(self, handle):
+        self.keyboard.remove_hotkey(handle)
+
+
+class NullHotkeyBackend:
+    # No OS hook (Linux, tests); press() drives the bound callbacks
     def __init__(self):
+        self.bindings = {}
+
+    def add(self, hotkey, callback):
+        handle = hotkey.lower()
+        self.bindings[handle] = callback
+        return handle
+
+    def remove(self, handle):
+        self.bindings.pop(handle, None)
+
+    def press(self, hotkey):
+        callback = self.bindings.get(hotkey.lower())
+        if callback:
+            callback()
+
+
+def make_hotkey_backend():
+    try:
+        return KeyboardHotkeyBackend()
+    except Exception as e:
+        print(f"⚠️ Global hotkeys unavailable: {e}")
+        return NullHotkeyBackend()
+
+
+class HotkeyBridge:
+    def __init__(self, root, backend, handlers):
+        self.root = root
+        self.backend = backend
+        self.handlers = handlers  # command name → callable, run on the Tk thread
+        self.queue = deque()      # append/popleft are atomic, no lock needed
+        self.wake_pending = False
+        self.bound = {}           # command name → (hotkey, backend handle)
+        root.bind(HOTKEY_EVENT, self.drain)
+
+    def bind(self, command, hotkey):
+        hotkey = (hotkey or "").strip()
+        old = self.bound.get(command)
+        if old and old[0] == hotkey:
+            return
+        if old:
+            del self.bound[command]
+            try:
+                self.backend.remove(old[1])
+            except Exception:
+                pass
+        if not hotkey:
+            return
+        try:
+            self.bound[command] = (hotkey, self.backend.add(hotkey, partial(self.push, command)))
+        except Exception as e:
+            print(f"⚠️ Keyboard hook failed for {hotkey} (run as Admin?): {e}")
+
+    def push(self, command, *args):
+        # Input/IPC thread: enqueue, then wake Tk once per batch
+        self.queue.append((command, args))
+        if not self.wake_pending:
+            self.wake_pending = True
+            try:
+                self.root.event_generate(HOTKEY_EVENT, when="tail")
+            except Exception:
+                self.wake_pending = False  # Tk is gone or shutting down
+
+    def drain(self, event=None):
+        self.wake_pending = False  # cleared first, so a racing push re-wakes us
+        while self.queue:
+            command, args = self.queue.popleft()
+            handler = self.handlers.get(command)
+            if handler:
+                try:
+                    handler(*args)
+                except (TypeError, ValueError) as e:
+                    print(f"⚠️ Command {command} {list(args)} failed: {e}")
+
+    def close(self):
+        for command in list(self.bound):
+            self.bind(command, "")
+
+
+# ——— Single instance (lock file + localhost command channel) ——————————————
+class InstanceLock:
+    # OS lock on a small file: dropped by the OS even if the overlay crashes
+    LOCK_OFFSET = 1024  # Windows locks block reads, so lock a byte past the endpoint text
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def acquire(self):
+        # False → another overlay holds it. True without `file` → no lock possible (read-only folder)
+        try:
+            f = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600), "r+", encoding="utf-8")
+        except OSError as e:
+            print(f"⚠️ Single-instance lock unavailable, running without it: {e}")
+            return True
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                f.seek(self.LOCK_OFFSET)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self.file = f
+        return True
+
+    def publish(self, port, token):
+        self.file.seek(0)
+        self.file.truncate()
+        self.file.write(f"{port} {token}\n")
+        self.file.flush()
+
+    def endpoint(self):
+        # (port, token) of the running overlay; ValueError until it has published them
+        with open(self.path, encoding="utf-8") as f:
+            port, token = f.readline().split()
+        return int(port), token
+
+    def release(self):
+        if self.file is not None:
+            self.file.close()  # closing the handle drops the OS lock
+            self.file = None
+
+
+class CommandServer(LocalServer):
+    # One JSON line per connection: {"token": ..., "commands": [[name, *args], ...]}
+    name = "command-server"
+
+    def __init__(self, push, token, port=0):
+        super().__init__(self.run_commands, port)
+        self.push = push    # HotkeyBridge.push: queued for the Tk thread
+        self.token = token
+
+    def run_commands(self, conn):
+        line = conn.makefile("rb").readline(65536)
+        try:
+            request = json.loads(line)
+            if request.get("token") != self.token:
+                raise ValueError("bad token")
+            commands = [(str(c[0]), *c[1:]) for c in request["commands"]]
+        except (ValueError, KeyError, TypeError, IndexError, AttributeError) as e:
+            conn.sendall(f"error: {e}\n".encode("utf-8"))
+            return
+        for command in commands:
+            self.push(*command)
+        conn.sendall(b"ok\n")
+
+
+def send_commands(lock, commands, timeout=IPC_CONNECT_TIMEOUT):
+    # Second launch: hand the commands to the running overlay; no Tk involved
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            port, token = lock.endpoint()
+            with socket.create_connection(("127.0.0.1", port), timeout=1.0) as conn:
+                conn.sendall((json.dumps({"token": token, "commands": commands}) + "\n").encode("utf-8"))
+                return conn.makefile("rb").readline().decode("utf-8").strip()
+        except (OSError, ValueError):
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)  # first instance is still starting up
+
+
+# ——— Font resolution (cached in config.ini) —————————————————————————————
+def font_fingerprint(root):
+    # ✅ Cheap: Tk version, DPI scaling and font-directory mtimes (a few stats)
+    font_dirs = [
+        os.path.join(os.environ.get("WINDIR", ""), "Fonts"),
+        os.path.join(os.environ.get("LOCALAPPDATA", ""), "Microsoft", "Windows", "Fonts"),
+        "/usr/share/fonts",
+        os.path.expanduser("~/.local/share/fonts"),
+        os.path.expanduser("~/.fonts"),
+        "/Library/Fonts",
+    ]
+    parts = [sys.platform, str(tk.TkVersion), f"{float(root.tk.call('tk', 'scaling')):.3f}"]
+    for path in font_dirs:
+        try:
+            parts.append(f"{path}:{os.stat(path).st_mtime_ns}")
+        except OSError:
+            pass
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def probe_font_family(root):
+    for name in SANS_FONTS:
+        try:
+            test = tkfont.Font(root=root, family=name, size=8)
+            if name.lower() in test.actual()['family'].lower():
+                return name
+        except tk.TclError:
+            pass
+    return 'TkDefaultFont'
+
+
+def measure_font_metrics(root, family):
+    # size → (ascent, descent, linespace, digit width)
+    metrics = {}
+    for size in FONT_SIZES:
+        font = tkfont.Font(root=root, family=family, size=size)
+        m = font.metrics()
+        metrics[size] = (m["ascent"], m["descent"], m["linespace"], font.measure("0"))
+    return metrics
+
+
+def resolve_font(root, config):
+    # Returns (family, metrics, cached); probing only when the fingerprint changed
+    fingerprint = font_fingerprint(root)
+    if config.get("fonts", "fingerprint") == fingerprint:
+        try:
+            family = config.get("fonts", "family")
+            metrics = {}
+            for item in config.get("fonts", "metrics").split(","):
+                size, values = item.split(":")
+                metrics[int(size)] = tuple(int(v) for v in values.split("/"))
+            if family and all(size in metrics for size in FONT_SIZES):
+                return family, metrics, True
+        except (AttributeError, ValueError):
+            pass
+    family = probe_font_family(root)
+    metrics = measure_font_metrics(root, family)
+    config.set("fonts", "fingerprint", fingerprint)
+    config.set("fonts", "family", family)
+    config.set("fonts", "metrics", ",".join(
+        f"{size}:{'/'.join(str(v) for v in values)}" for size, values in sorted(metrics.items())
+    ))
+    return family, metrics, False
+
+
+class TextMetrics:
+    # Pixel widths measured once per (family, size, template), then served from memory
+    def __init__(self, root, family, font_metrics, cache_size=TEXT_WIDTH_CACHE_SIZE):
+        self.root = root
+        self.family = family
+        self.font_metrics = font_metrics  # size → (ascent, descent, linespace, digit width)
+        self.fonts = {}
+        self.cache_size = cache_size
+        self.widths = OrderedDict()  # (family, size, template) → pixels
+        self.measures = 0
+
+    def linespace(self, size):
+        return self.font_metrics.get(size, (0, 0, 19, 8))[2]
+
+    def width(self, size, template):
+        key = (self.family, size, template)
+        width = self.widths.get(key)
+        if width is not None:
+            self.widths.move_to_end(key)
+            return width
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = tkfont.Font(root=self.root, family=self.family, size=size)
+        width = self.widths[key] = font.measure(template)
+        self.measures += 1
+        while len(self.widths) > self.cache_size:
+            self.widths.popitem(last=False)
+        return width
+
+
+class StartupTimer:
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.phases = []  # (name, ms)
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000.0))
+        self.last = now
+
+    def total_ms(self):
+        return (self.last - self.start) * 1000.0
+
+    def breakdown(self):
+        # Phases summed by name, in order of first appearance
+        totals = {}
+        for name, ms in self.phases:
+            totals[name] = totals.get(name, 0.0) + ms
+        return list(totals.items())
+
+
+# ——— Headless clock engine (time, alarms, config; no Tk) ——————————————————
+class SystemClock:
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def now(self):
+        return datetime.fromtimestamp(self.time())
+
+
+class OffsetClock:
+    # Wall clock corrected by `offset` seconds (set by NtpSync); monotonic time is untouched
+    def __init__(self, base=None):
+        self.base = base or SystemClock()
+        self.offset = 0.0
+
+    def time(self):
+        return self.base.time() + self.offset
+
+    def monotonic(self):
+        return self.base.monotonic()
+
+    def now(self):
+        return datetime.fromtimestamp(self.time())
+
+
+class FakeClock:
+    # Injectable clock for benchmarks/tests: advance() moves both clocks,
+    # step() only the wall clock (NTP step, resume)
+    def __init__(self, start=None):
+        self.wall = time.time() if start is None else start
+        self.mono = 1000.0
+
+    def time(self):
+        return self.wall
+
+    def monotonic(self):
+        return self.mono
+
+    def now(self):
+        return datetime.fromtimestamp(self.wall)
+
+    def advance(self, seconds):
+        self.wall += seconds
+        self.mono += seconds
+
+    def step(self, seconds):
+        self.wall += seconds
+
+
+class ClockEngine:
+    def __init__(self, config, clock=None, audio_backend=None):
+        self.config = config  # ConfigStore
+        self.clock = clock or SystemClock()
+        self.alarms = AlarmEngine()
+        self.audio = AlarmAudio(audio_backend)
+        self.snooze_count = 0
+        # ✅ Rows: local time first, then optional zones and countdowns
+        self.show_seconds = False
+        self.zones = ""
+        self.zone_rows = []
+        self.countdowns = CountdownBoard([], self.clock.time())
+        self.stopwatch = Stopwatch()
+        self.stopwatch_shown = False
+        self.calendar_file = None  # CalendarFile; None → no calendar configured
+        self.calendar = None       # CalendarIndex of its upcoming events
+        self.calendar_lead = CALENDAR_LEAD_MINUTES * 60
+        self.calendar_row = CalendarRow()
+        self.calendar_alarms = 0
+        self.rows = [ZoneClock("")]
+
+    # ——— Rows ———
+    def set_zones(self, zones):
+        self.zones = zones
+        self.config.set("window", "zones", zones)
+        self.zone_rows = parse_zones(zones)
+        self.rebuild_rows()
+
+    def load_countdowns(self):
+        countdowns = []
+        for countdown_id, spec in self.config.items("countdowns"):
+            try:
+                countdowns.append(Countdown.from_spec(spec))
+            except ValueError as e:
+                print(f"⚠️ Countdown {countdown_id} ignored: {e}")
+        self.countdowns = CountdownBoard(countdowns, self.clock.time())
+        self.rebuild_rows()
+
+    def set_calendar(self, path, lead_minutes=CALENDAR_LEAD_MINUTES):
+        # Takes effect on the next check_calendar(); the row shows "No events" until then
+        self.calendar_lead = lead_minutes * 60
+        if path != (self.calendar_file.path if self.calendar_file else ""):
+            self.calendar_file = CalendarFile(path) if path else None
+            self.calendar = self.calendar_row.calendar = None
+            self.rebuild_rows()
+
+    def check_calendar(self, wait=False):
+        # ✅ One stat per call; the .ics is hashed when it was touched and re-parsed only if that changed
+        if self.calendar_file is None:
+            return False
+        index = self.calendar_file.check(self.clock.time(), wait)
+        if index is None:
+            return False
+        if self.calendar is not None:
+            index.alerted = max(index.alerted, self.calendar.alerted)  # a re-import doesn't repeat alerts
+        self.calendar = self.calendar_row.calendar = index
+        return True
+
+    def rebuild_rows(self):
+        self.rows = self.rows[:1] + self.zone_rows + self.countdowns.countdowns
+        if self.calendar_file is not None:
+            self.rows.append(self.calendar_row)
+        if self.stopwatch_shown:
+            self.rows.append(self.stopwatch)  # always last
+
+    def texts(self, ts):
+        self.countdowns.advance(ts)
+        return [row.text(ts, self.show_seconds) for row in self.rows]
+
+    def tick(self, now):
+        # One display tick: (row texts, alarms that fired)
+        return self.texts(now.timestamp()), self.check_alarms(now)
+
+    # ——— Alarms ———
+    def primary_alarm(self):
+        # The dialog edits the lowest-numbered alarm; the rest live in [alarms]
+        ids = [alarm_id for alarm_id in self.alarms.alarms if alarm_id.isdigit()]
+        if ids:
+            return self.alarms.alarms[min(ids, key=int)]
+        return Alarm("1", 12, 0, "Time to take a break!", enabled=False)
+
+    def save_alarm(self, alarm):
+        self.config.set("alarms", alarm.id, alarm.to_spec())
+        if alarm.sound:
+            self.config.set("alarm_sounds", alarm.id, alarm.sound)
+        else:
+            self.config.remove("alarm_sounds", alarm.id)
+
+    def set_alarm(self, alarm):
+        self.alarms.add(alarm, self.clock.now())
+        self.save_alarm(alarm)
+
+    def reload_alarms(self):
+        # [alarms] edited on disk: replace the saved alarms, keep pending snoozes
+        for alarm in [a for a in self.alarms.alarms.values() if a.persistent]:
+            self.alarms.remove(alarm.id)
+        self.load_alarms()
+
+    def add_once(self, when, message):
+        # "HH:MM" → one-shot alarm at the next such time, saved in [alarms] as "scriptN"
+        hour, minute = (int(part) for part in when.split(":"))
+        if not (0 <= hour <= 23 and 0 <= minute <= 59):
+            raise ValueError(f"bad time {when!r}")
+        # Reuse the id of a scripted one-shot that already fired, so they don't pile up in [alarms];
+        # numbered alarms belong to the dialog and the user and are never recycled
+        scripted = {int(a.id[6:]): a for a in self.alarms.alarms.values()
+                    if a.id.startswith("script") and a.id[6:].isdigit()}
+        spent = [number for number, a in scripted.items() if not a.enabled]
+        number = min(spent) if spent else max(scripted, default=0) + 1
+        alarm = Alarm(f"script{number}", hour, minute, message.strip() or "Alarm!", "once")
+        alarm.at = alarm.next_time_of_day(self.clock.now())
+        self.set_alarm(alarm)
+        return alarm
+
+    def load_alarms(self, preload=True):
+        # ✅ Loaded once into the engine; the old single [alarm] block is migrated
+        now = self.clock.now()
+        config = self.config
+        if "alarms" not in config and "alarm" in config:
+            try:
+                alarm = Alarm(
+                    "1",
+                    config.getint("alarm", "hour", fallback=12),
+                    config.getint("alarm", "minute", fallback=0),
+                    config.get("alarm", "message", fallback="Time to take a break!").strip(),
+                    enabled=bool(int(config.get("alarm", "enabled", fallback="0")))
+                )
+                self.save_alarm(alarm)
+            except ValueError as e:
+                print(f"⚠️ Alarm config error: {e}")
+            config.remove_section("alarm")
+        sounds = dict(config.items("alarm_sounds"))
+        for alarm_id, spec in config.items("alarms"):
+            try:
+                alarm = Alarm.from_spec(alarm_id, spec, now)
+            except ValueError as e:
+                print(f"⚠️ Alarm {alarm_id} ignored: {e}")
+                continue
+            alarm.sound = sounds.get(alarm_id, "").strip()
+            self.alarms.add(alarm, now)
+        if preload:
+            self.preload_sounds()
+
+    def preload_sounds(self):
+        # ✅ Decode sounds now so firing an alarm never touches the disk
+        # (no sound device, e.g. off Windows: nothing to decode, and no missing-file warning per reload)
+        if isinstance(self.audio.open_backend(), NullAudioBackend):
+            return
+        self.audio.preload(dict.fromkeys(a.sound for a in self.alarms.alarms.values() if a.enabled and a.sound))
+
+    def check_alarms(self, now):
+        # ✅ One heap peek per tick; one-shot alarms disable themselves
+        fired = self.alarms.due(now)
+        for alarm in fired:
+            self.audio.play(alarm.sound)
+            if alarm.repeat == "once":
+                if alarm.persistent:
+                    self.save_alarm(alarm)
+                else:
+                    self.alarms.remove(alarm.id)
+        if self.calendar is not None:
+            # ✅ Calendar alerts: two bisects per tick, however many events are imported
+            lead = self.calendar_lead
+            for start, summary in self.calendar.due(now.timestamp(), lead):
+                at = datetime.fromtimestamp(start)
+                self.calendar_alarms += 1
+                alarm = Alarm(f"calendar{self.calendar_alarms}", at.hour, at.minute,
+                              f"{summary} at {at:%H:%M}" if lead else summary, "once", at=at, enabled=False)
+                alarm.persistent = False
+                alarm.due_at = datetime.fromtimestamp(start - lead)
+                self.audio.play(alarm.sound)
+                fired.append(alarm)
+        return fired
+
+    def next_fire(self):
+        # Earliest alarm or calendar alert (wake-up while hidden)
+        at = self.alarms.next_fire()
+        if self.calendar is not None:
+            ts = self.calendar.next_alert(self.calendar_lead)
+            if ts is not None:
+                alert = datetime.fromtimestamp(ts)
+                at = alert if at is None else min(at, alert)
+        return at
+
+    def snooze(self, messages):
+        # Re-fire once in SNOOZE_MINUTES; snoozes are never written to [alarms]
+        now = self.clock.now()
+        at = now.replace(second=0, microsecond=0) + timedelta(minutes=SNOOZE_MINUTES)
+        for message in dict.fromkeys(messages):
+            self.snooze_count += 1
+            snooze = Alarm(f"snooze{self.snooze_count}", at.hour, at.minute, message, "once", at=at)
+            snooze.persistent = False
+            self.alarms.add(snooze, now)
+        return at
+
+
+# ——— Window pool (popups built once, then hidden and reused) ————————————
+class WindowPool:
+    def __init__(self, release=False):
+        self.windows = {}  # kind → {"window": Toplevel, ...widgets/vars}
+        self.builds = 0
+        self.release = release  # low-footprint mode: destroy on hide, rebuild on next use
+
+    def get(self, kind, build):
+        entry = self.windows.get(kind)
+        if entry is not None:
+            try:
+                if entry["window"].winfo_exists():
+                    return entry
+            except tk.TclError:
+                pass
+        entry = build()
+        self.windows[kind] = entry
+        self.builds += 1
+        return entry
+
+    def hide(self, kind):
+        entry = self.windows.get(kind)
+        if entry is not None:
+            try:
+                if self.release:
+                    del self.windows[kind]
+                    entry["window"].destroy()
+                else:
+                    entry["window"].withdraw()
+            except tk.TclError:
+                pass
+
+    def clear(self):
+        # Colors/fonts changed: drop everything, rebuilt on next use
+        for entry in self.windows.values():
+            try:
+                entry["window"].destroy()
+            except tk.TclError:
+                pass
+        self.windows = {}
+
+
+# ——— Alarm audio (preloaded WAVs, pluggable backend) ——————————————————————
+class WinsoundBackend:
+    def __init__(self):
+        import winsound  # ✅ for sound
+        self.winsound = winsound
+
+    def play(self, data):
+        # SND_MEMORY cannot be combined with SND_ASYNC, so this blocks the audio thread
+        self.winsound.PlaySound(data, self.winsound.SND_MEMORY | self.winsound.SND_NODEFAULT)
+
+    def beep(self):
+        self.winsound.Beep(1000, 300)
+
+    def stop(self):
+        self.winsound.PlaySound(None, 0)
+
+
+class NullAudioBackend:
+    # No sound device (Linux, tests): counts what would have been played
+    def __init__(self):
+        self.plays = 0
+        self.beeps = 0
+
+    def play(self, data):
+        self.plays += 1
+
+    def beep(self):
+        self.beeps += 1
+
+    def stop(self):
+        pass
+
+
+def make_audio_backend():
+    try:
+        return WinsoundBackend()
+    except ImportError:
+        return NullAudioBackend()
+
+
+class AlarmAudio:
+    def __init__(self, backend=None, default_path=sound_path, cache_size=AUDIO_CACHE_SIZE):
+        self.backend = backend  # None: make_audio_backend() on first use
+        self.default_path = default_path
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # path → WAV bytes (None: missing/invalid)
+        self.loads = 0
+        self.queue = None
+        self.thread = None
+
+    def load(self, path):
+        if path in self.cache:
+            self.cache.move_to_end(path)
+            return self.cache[path]
+        import wave  # ✅ deferred until the first sound is loaded
+        data = None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            with wave.open(io.BytesIO(data)) as w:  # validate the header once
+                w.getnframes()
+        except (OSError, EOFError, wave.Error) as e:
+            print(f"⚠️ Alarm sound unavailable ({path}): {e}")
+            data = None
+        self.loads += 1
+        self.cache[path] = data
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return data
+
+    def preload(self, paths=()):
+        for path in [self.default_path, *paths][:self.cache_size]:
+            self.load(path)
+
+    def play(self, path=None):
+        # ✅ Cache hit: no disk I/O on the Tk thread, playback on the audio thread
+        data = self.load(path or self.default_path)
+        if data is None and path:
+            data = self.load(self.default_path)
+        if self.queue is None:  # ✅ the worker thread starts with the first alarm
+            self.queue = queue.SimpleQueue()
+            self.thread = threading.Thread(target=self.run, name="alarm-audio", daemon=True)
+            self.thread.start()
+        if not self.queue.empty():
+            return  # a sound is already pending; merged alarms ring once
+        self.queue.put(data)
+
+    def open_backend(self):
+        if self.backend is None:
+            self.backend = make_audio_backend()
+        return self.backend
+
+    def stop(self):
+        if self.backend is None:
+            return  # nothing has ever played
+        try:
+            self.backend.stop()
+        except Exception:
+            pass
+
+    def run(self):
+        self.open_backend()
+        while True:
+            data = self.queue.get()
+            try:
+                if data is None:
+                    self.backend.beep()  # fallback
+                else:
+                    self.backend.play(data)
+            except Exception as e:
+                print(f"⚠️ Alarm sound failed: {e}")
+
+
+# ——— Memory (RSS, tracemalloc by subsystem) ——————————————————————————————
+def rss_bytes():
+    # Resident set size of this process, None if unknown
+    if sys.platform == "win32":
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", ctypes.c_uint32), ("PageFaultCount", ctypes.c_uint32)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        try:
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except (AttributeError, OSError):
+            pass
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def source_spans():
+    # (first line, last line, name) of each top-level class/function in this file
+    import ast
+    try:
+        with open(__file__, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+    except (OSError, SyntaxError, ValueError):
+        return []  # frozen build without sources
+    return [(node.lineno, node.end_lineno, node.name) for node in tree.body
+            if isinstance(node, (ast.ClassDef, ast.FunctionDef))]
+
+
+def memory_report(limit=10):
+    # Live traced allocations by subsystem: the class/function of this file that made them
+    # (nearest frame), else the library module. [] unless tracemalloc is tracing (--trace-memory).
+    import tracemalloc
+    if not tracemalloc.is_tracing():
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+    spans = source_spans()  # after the snapshot, so parsing the source isn't counted
+    here = os.path.abspath(__file__)
+    totals = {}
+    for stat in snapshot.statistics("traceback"):
+        name = None
+        for frame in reversed(stat.traceback):  # most recent call first
+            if os.path.abspath(frame.filename) == here:
+                # module-level lines are imports/constants: charge those to the library instead
+                name = next((n for first, last, n in spans if first <= frame.lineno <= last), None)
+                if name is not None:
+                    break
+        if name is None:
+            path, module = os.path.split(os.path.splitext(stat.traceback[-1].filename)[0])
+            name = os.path.basename(path) if module == "__init__" else module
+        size, count = totals.get(name, (0, 0))
+        totals[name] = (size + stat.size, count + stat.count)
+    ranked = sorted(totals.items(), key=lambda item: -item[1][0])
+    return [(name, size, count) for name, (size, count) in ranked[:limit]]
+
+
+# ——— Alarm history (append-only JSONL, background writer) ——————————————————
+class HistoryLog:
+    def __init__(self, path, max_bytes=HISTORY_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.queue = None
+        self.thread = None
+        self.written = 0
+
+    def log(self, event, when, **fields):
+        # Tk thread: build the line and enqueue it; the disk is only touched by the writer
+        entry = {"t": when.isoformat(timespec="seconds"), "event": event, **fields}
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        if self.queue is None:  # ✅ the writer thread starts with the first entry
+            self.queue = queue.SimpleQueue()
+            self.thread = threading.Thread(target=self.run, name="alarm-history", daemon=True)
+            self.thread.start()
+        self.queue.put(line)
+
+    def run(self):
+        while True:
+            lines = [self.queue.get()]
+            while not self.queue.empty():  # ✅ one append per burst of entries
+                lines.append(self.queue.get())
+            if None in lines:
+                self.write([line for line in lines if line is not None])
+                return
+            self.write(lines)
+
+    def write(self, lines):
+        if not lines:
+            return
+        data = "".join(lines).encode("utf-8")
+        try:
+            try:
+                if os.path.getsize(self.path) + len(data) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")  # keep one previous file
+            except FileNotFoundError:
+                pass
+            with open(self.path, "ab") as f:
+                f.write(data)
+            self.written += len(lines)
+        except OSError as e:
+            print(f"⚠️ Alarm history write failed: {e}")
+
+    def close(self, timeout=1.0):
+        # Exit: let the writer drain what is queued
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join(timeout)
+
+    def tail(self, n):
+        # Last n entries, newest last; reads backwards in blocks instead of parsing the whole file
+        entries = []
+        for path in (self.path, self.path + ".1"):
+            lines = read_last_lines(path, n - len(entries))
+            for line in reversed(lines):
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    pass  # torn line (crash mid-write)
+            if len(entries) >= n:
+                break
+        entries.reverse()
+        return entries
+
+
+def read_last_lines(path, n, block=4096):
+    if n <= 0:
+        return []
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return []
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        data = b""
+        pos = end
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.decode("utf-8", "replace").splitlines()
+    if pos > 0:
+        lines = lines[1:]  # first line may be cut off by the block boundary
+    return [line for line in lines if line.strip()][-n:]
+
+
+# ——— SNTP offset (background thread, smoothed) ————————————————————————————
+def ntp_to_unix(data):
+    return int.from_bytes(data[:4], "big") - NTP_EPOCH + int.from_bytes(data[4:8], "big") / 2 ** 32
+
+
+def unix_to_ntp(ts):
+    seconds = int(ts) + NTP_EPOCH
+    return seconds.to_bytes(4, "big") + int((ts % 1) * 2 ** 32).to_bytes(4, "big")
+
+
+def sntp_query(host, port=123, timeout=NTP_TIMEOUT, clock=time.time):
+    # One SNTP round trip → (offset, round-trip time) in seconds; blocking, call off the Tk thread
+    t1 = clock()
+    request = bytes([0x23]) + bytes(39) + unix_to_ntp(t1)  # LI 0, version 4, mode 3 (client)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        sock.sendto(request, (host, port))
+        while True:
+            reply, _ = sock.recvfrom(512)
+            t4 = clock()
+            if len(reply) >= 48 and reply[24:32] == request[40:48]:
+                break  # ignore stray/late packets: the reply must echo our transmit time
+    if reply[0] & 0x07 != 4 or reply[1] == 0:
+        raise ValueError("not a usable server reply (kiss-o'-death?)")
+    t2 = ntp_to_unix(reply[32:40])  # server receive
+    t3 = ntp_to_unix(reply[40:48])  # server transmit
+    return ((t2 - t1) + (t3 - t4)) / 2, (t4 - t1) - (t3 - t2)
+
+
+class NtpSync:
+    # Queries `server` ("host" or "host:port") every `interval` s and feeds the smoothed offset to `clock`
+    def __init__(self, clock, server, interval=NTP_INTERVAL, on_step=None):
+        self.clock = clock  # OffsetClock
+        self.on_step = on_step  # called on the sync thread when the applied offset moves > TIME_JUMP_THRESHOLD
+        host, _, port = server.partition(":")
+        self.host = host
+        self.port = int(port) if port else 123
+        if not 0 < self.port < 65536:
+            raise ValueError(f"port {self.port} out of range")
+        self.server = server
+        self.interval = interval
+        self.timeout = NTP_TIMEOUT
+        self.offset = 0.0
+        self.rtt = None
+        self.samples = 0
+        self.error = None
+        self.stop_event = None
+        self.thread = None
+
+    def start(self):
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="ntp-sync", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+    def run(self):
+        while True:
+            self.sync_once()
+            if self.stop_event.wait(self.interval):
+                return
+
+    def sync_once(self):
+        try:
+            offset, rtt = sntp_query(self.host, self.port, self.timeout, clock=self.clock.base.time)
+        except (OSError, ValueError, OverflowError) as e:
+            self.error = str(e) or type(e).__name__
+            return False
+        if rtt > NTP_MAX_RTT:
+            self.error = f"RTT {rtt * 1000:.0f} ms, sample dropped"
+            return False
+        # ✅ Exponential smoothing: one noisy sample moves the clock only a little
+        self.offset = offset if not self.samples else self.offset + NTP_SMOOTHING * (offset - self.offset)
+        self.samples += 1
+        self.rtt = rtt
+        self.error = None
+        if self.stop_event is not None and self.stop_event.is_set():
+            return False  # stopped mid-query (server cleared or changed): don't publish a stale offset
+        stepped = abs(self.offset - self.clock.offset) > TIME_JUMP_THRESHOLD
+        self.clock.offset = self.offset  # a single float store; read by the Tk thread
+        if stepped and self.on_step is not None:
+            self.on_step()  # the ticker would only notice at its next boundary, up to a minute later
+        return True
+
+    def status(self):
+        if not self.samples:
+            return f"NTP {self.server}: {self.error or 'syncing…'}"
+        text = f"NTP {self.server}: {self.offset:+.3f} s, RTT {self.rtt * 1000:.0f} ms"
+        return f"{text} ({self.error})" if self.error else text
+
+
+class ClockOverlay:
+    def __init__(self, profile_startup=False, instance=None, commands=()):
+        self.startup = StartupTimer(STARTUP_T0)
+        self.startup.mark("imports")
+        self.profile_startup = profile_startup
+        self.instance = instance          # InstanceLock held by this process
+        self.startup_commands = commands  # from our own command line, run once ready
+        self.command_server = None
+        self.config_watch = None
         self.root = tk.Tk()
         self.root.overrideredirect(True)
         self.root.attributes("-topmost", True)
@@ -54,16 +2429,18 @@ class ClockOverlay:
             outline=""
         )
 
-        sans_fonts = ['Segoe UI', 'Helvetica', 'Arial', 'DejaVu Sans', 'Noto Sans']
-        self.font_name = 'TkDefaultFont'
-        for name in sans_fonts:
-            try:
-                test = tk.font.Font(family=name, size=8)
-                if name.lower() in test.actual()['family'].lower():
-                    self.font_name = name
-                    break
-            except:
-                pass
+        self.startup.mark("tk init")
+        # ✅ Config is parsed once, up front; font resolution is cached in it
+        self.config = ConfigStore(CONFIG_FILE, self.root.after, self.root.after_cancel)
+        self.startup.mark("config")
+        self.font_name, self.font_metrics, self.font_cached = resolve_font(self.root, self.config)
+        self.text_metrics = TextMetrics(self.root, self.font_name, self.font_metrics)
+        self.startup.mark("fonts")
+        self.engine = ClockEngine(self.config, clock=OffsetClock())
+        self.ntp = None
+        self.ntp_server = ""
+        self.ntp_interval = NTP_INTERVAL
+        self.calendar_prefix = None  # label of the next-event row at the last layout
 
         self.text_id = self.canvas.create_text(
             self.outer_width // 2,
@@ -80,63 +2457,143 @@ class ClockOverlay:
         # Font size: 20 (top) → 10 (bottom), with checkmark
         self.font_size = 11
         self.font_menu = tk.Menu(self.context_menu, tearoff=0)
-        for size in reversed(range(10, 21)):
-            label = f"{'✓ ' if size == self.font_size else '  '}{size}"
-            self.font_menu.add_command(
-                label=label,
-                command=lambda s=size: self.set_font_size(s)
-            )
+        self.font_choices = CheckMenu(self.font_menu, FONT_SIZES, self.set_font_size, current=self.font_size)
         self.context_menu.add_cascade(label="Font size", menu=self.font_menu)
 
         # Alpha: 100% (top) → 0% (bottom), with checkmark
         self.alpha_percent = 100
         self.alpha_menu = tk.Menu(self.context_menu, tearoff=0)
-        for alpha in reversed(range(0, 101, 5)):
-            label = f"{'✓ ' if alpha == self.alpha_percent else '  '}{alpha}%"
-            self.alpha_menu.add_command(
-                label=label,
-                command=lambda a=alpha: self.set_alpha(a)
-            )
+        self.alpha_choices = CheckMenu(self.alpha_menu, ALPHA_STEPS, self.set_alpha,
+                                       fmt=lambda a: f"{a}%", current=self.alpha_percent)
         self.context_menu.add_cascade(label="Alpha", menu=self.alpha_menu)
 
         # Lock / Unlock
         self.locked = False
         self.lock_menu = tk.Menu(self.context_menu, tearoff=0)
+        self.lock_choices = CheckMenu(self.lock_menu, [True, False], self.set_locked,
+                                      fmt=lambda v: "Lock" if v else "Unlock", current=self.locked)
         self.context_menu.add_cascade(label="Lock / Unlock", menu=self.lock_menu)
-        self.update_lock_menu()
+
+        # Display: HH:MM or HH:MM:SS
+        self.show_seconds = False
+        self.format_menu = tk.Menu(self.context_menu, tearoff=0)
+        self.format_choices = CheckMenu(self.format_menu, [False, True], self.set_show_seconds,
+                                        fmt=lambda v: "HH:MM:SS" if v else "HH:MM", current=self.show_seconds)
+        self.context_menu.add_cascade(label="Display", menu=self.format_menu)
 
         # ✅ Alarm menu item
         self.context_menu.add_command(label="Alarm…", command=self.show_alarm_dialog)
 
+        # Stopwatch / countdown timer (tenths of a second)
+        self.stopwatch_menu = tk.Menu(self.context_menu, tearoff=0)
+        self.stopwatch_menu.add_command(label="Start / Pause", command=self.toggle_stopwatch)
+        self.stopwatch_menu.add_command(label="Reset", command=self.reset_stopwatch)
+        self.stopwatch_menu.add_separator()
+        for seconds in STOPWATCH_PRESETS:
+            self.stopwatch_menu.add_command(label=f"Count down {seconds // 60}:00",
+                                            command=partial(self.start_countdown, seconds))
+        self.stopwatch_menu.add_separator()
+        self.stopwatch_menu.add_command(label="Hide", command=self.hide_stopwatch)
+        self.context_menu.add_cascade(label="Stopwatch", menu=self.stopwatch_menu)
+
         self.context_menu.add_separator()
+        self.context_menu.add_command(label="History", command=self.show_history)
+        self.context_menu.add_command(label="Stats", command=self.show_stats)
         self.context_menu.add_command(label="About", command=self.show_about)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="Exit", command=self.exit_app)
 
         # Bindings
+        self.drag = DragController(self.root)
         self.canvas.bind("<Button-3>", self.show_context_menu)
         self.canvas.bind("<Button-1>", self.start_move)
         self.canvas.bind("<B1-Motion>", self.do_move)
         self.canvas.bind("<ButtonRelease-1>", self.on_move_release)
 
-        self.update_job = None
+        self.wakeups = WakeupCounter()
+        self.stats = TickStats()
+        self.stats_port = 0
+        self.stats_server = None
+        self.ticker = TickScheduler(self.root, self.update_time, wakeups=self.wakeups,
+                                    clock=self.engine.clock, lateness=self.stats.lateness)
+        # ✅ One canvas item per engine row (local, zones, countdowns); one shared tick
+        self.row_ids = [self.text_id]
+        self.row_texts = [None]
+        self.suspended = None  # True while nothing is visible (hidden or alpha 0)
+        self.alarm_wake_job = None
         self.dragging = False
         self.visible = True
 
-        # ✅ Alarm state
-        self.alarm_enabled = False
-        self.alarm_hour = 12
-        self.alarm_minute = 0
-        self.alarm_message = "Time to take a break!"
+        # ✅ Alarm popup state (alarms themselves live in the engine)
+        self.alert_messages = []
+        self.popups = WindowPool()
+        self.history = HistoryLog(HISTORY_FILE)
 
-        # ✅ Hotkey (load before setup)
+        # ✅ Hotkeys (load before setup; the hook itself is installed after first paint)
         self.hotkey = "F12"
+        self.lock_hotkey = ""
+        self.snooze_hotkey = ""
+        self.stopwatch_hotkey = ""
+        self.stopwatch_frame_ms = STOPWATCH_FRAME_MS
+        self.stopwatch_job = None
+        self.hotkeys = None
+        self.first_paint_ms = None
+        self.ready = False  # set at the end of load_deferred(), after the first paint
+        self.startup.mark("ui")
         self.load_config()
-        self.setup_global_hotkey()
+        self.startup.mark("config")
+
+        self.update_activity()
+        self.root.after_idle(self.first_paint)
 
-        self.update_time()
+    def run(self):
         self.root.mainloop()
 
+    # ——— Fast start: paint the clock first, load the rest on idle ————————————
+    def first_paint(self):
+        self.root.update_idletasks()
+        self.startup.mark("first paint")
+        self.first_paint_ms = self.startup.total_ms()
+        self.root.after(0, self.load_deferred)  # let pending expose/input events run first
+
+    def load_deferred(self):
+        # `keyboard` is slow to import and installs an OS hook; sounds and dialogs wait too
+        self.hotkeys = HotkeyBridge(self.root, make_hotkey_backend(), {
+            "toggle": self.toggle_visibility,
+            "lock": self.toggle_lock,
+            "snooze": self.snooze_alarm,
+            "stopwatch": self.toggle_stopwatch,
+            # command channel (second launches)
+            "show": self.show_window,
+            "set_lock": self.set_locked,
+            "set_alarm": self.add_quick_alarm,
+            # NTP sync thread
+            "clock_stepped": self.clock_stepped,
+        })
+        self.setup_global_hotkey()
+        self.start_command_server()
+        self.startup.mark("hotkey ready")
+        self.start_config_watch()
+        self.engine.check_calendar()  # imported in the background; update_time() / alarm_wake() pick it up
+        self.alarms_changed()
+        self.engine.preload_sounds()
+        self.startup.mark("audio")
+        import tkinter.messagebox  # noqa: F401 (alarm dialog errors)
+        self.startup.mark("dialogs")
+        self.start_stats_server()
+        self.start_ntp()
+        self.ready = True
+        if self.profile_startup:
+            self.report_startup()
+
+    def report_startup(self):
+        source = "cached" if self.font_cached else "probed"
+        print(f"⏱ Startup profile (fonts {source}):")
+        for name, ms in self.startup.breakdown():
+            print(f"  {name:<14}{ms:8.1f} ms")
+        print(f"  {'first paint at':<14}{self.first_paint_ms:8.1f} ms")
+        print(f"  {'total':<14}{self.startup.total_ms():8.1f} ms")
+
     # ——— F12: Show/Hide (global) —————————————————————————————————————————————
     def toggle_visibility(self):
         self.visible = not self.visible
@@ -145,128 +2602,235 @@ class ClockOverlay:
             self.root.attributes("-topmost", True)
         else:
             self.root.withdraw()
+        self.update_activity()
 
-    def setup_global_hotkey(self):
-        try:
-            keyboard.remove_hotkey(self.hotkey)
-        except:
-            pass
+    def show_window(self):
+        if not self.visible:
+            self.toggle_visibility()
 
-        def hotkey_thread():
+    # ——— Command channel (single instance) ————————————————————————————————
+    def start_command_server(self):
+        # ✅ Later launches forward --toggle/--lock/--set-alarm here instead of starting Tk
+        if self.instance is not None:
             try:
-                keyboard.add_hotkey(self.hotkey, self.toggle_visibility)
-                keyboard.wait()
-            except Exception as e:
-                print(f"⚠️ Keyboard hook failed (run as Admin?): {e}")
+                self.command_server = CommandServer(self.hotkeys.push, os.urandom(16).hex())
+                self.command_server.start()
+                self.instance.publish(self.command_server.port, self.command_server.token)
+            except OSError as e:
+                self.command_server = None
+                print(f"⚠️ Command channel unavailable: {e}")
+        for command in self.startup_commands:
+            self.hotkeys.push(*command)
+
+    def add_quick_alarm(self, when, message):
+        self.engine.add_once(when, message)
+        self.alarms_changed()
+
+    # ——— Idle suspension ——————————————————————————————————————————————————
+    def update_activity(self):
+        # ✅ Nothing visible → no clock ticks, only the next alarm's wake-up
+        suspended = not self.visible or self.alpha_percent == 0
+        if suspended == self.suspended:
+            return
+        self.suspended = suspended
+        if suspended:
+            self.wakeups.enter("hidden")
+            self.ticker.stop()
+            self.arm_alarm_wake()
+        else:
+            self.wakeups.enter("shown")
+            self.cancel_alarm_wake()
+            self.ticker.resync()  # redraw immediately on restore
+        self.arm_stopwatch()
+
+    def arm_alarm_wake(self):
+        self.cancel_alarm_wake()
+        next_fire = self.engine.next_fire()
+        importing = self.engine.calendar_file is not None and self.engine.calendar_file.busy()
+        if next_fire is None and not importing:
+            return
+        delay_ms = ALARM_WAKE_MAX_MS
+        if next_fire is not None:
+            delay_ms = math.ceil((next_fire - self.engine.clock.now()).total_seconds() * 1000)
+        if importing:
+            delay_ms = min(delay_ms, CALENDAR_POLL_MS)  # come back for the imported calendar
+        self.alarm_wake_job = self.root.after(max(1, min(ALARM_WAKE_MAX_MS, delay_ms)), self.alarm_wake)
+
+    def cancel_alarm_wake(self):
+        if self.alarm_wake_job is not None:
+            try:
+                self.root.after_cancel(self.alarm_wake_job)
+            except Exception:
+                pass
+            self.alarm_wake_job = None
 
-        t = threading.Thread(target=hotkey_thread, daemon=True)
-        t.start()
+    def alarm_wake(self):
+        self.alarm_wake_job = None
+        self.wakeups.count()
+        self.engine.check_calendar()  # hidden: update_time isn't running to pick up an import
+        for alarm in self.engine.check_alarms(self.engine.clock.now()):
+            self.trigger_alarm(alarm)
+        self.arm_alarm_wake()
+
+    def alarms_changed(self):
+        # Alarm set edited while hidden: the pending wake-up may be wrong now
+        if self.suspended:
+            self.arm_alarm_wake()
+
+    def setup_global_hotkey(self):
+        # ✅ Safe to call again: only changed bindings are swapped, no new threads
+        if self.hotkeys is None:
+            return  # still starting up; load_deferred() binds them
+        self.hotkeys.bind("toggle", self.hotkey)
+        self.hotkeys.bind("lock", self.lock_hotkey)
+        self.hotkeys.bind("snooze", self.snooze_hotkey)
+        self.hotkeys.bind("stopwatch", self.stopwatch_hotkey)
+
+    # ——— Popups (pooled) ——————————————————————————————————————————————————
+    def place_popup(self, entry, center=False):
+        window = entry["window"]
+        window.update_idletasks()
+        w = window.winfo_reqwidth()
+        h = window.winfo_reqheight()
+        if center:
+            # ✅ Center dialog on screen
+            x = (self.root.winfo_screenwidth() - w) // 2
+            y = (self.root.winfo_screenheight() - h) // 2
+            window.geometry(f"+{x}+{y}")
+        else:
+            # ✅ Auto height + anchor to bottom-right of clock
+            x = self.drag.x + self.outer_width - w
+            y = self.drag.y + self.outer_height - h
+            window.geometry(f"{w}x{h}+{x}+{y}")
+        window.deiconify()
+        window.attributes("-topmost", True)
+        window.lift()
 
     # ——— Alarm dialog —————————————————————————————————————————————————————
-    def show_alarm_dialog(self):
+    def build_alarm_dialog(self):
         dialog = tk.Toplevel(self.root)
+        dialog.withdraw()
         dialog.title("Set Alarm")
         dialog.attributes("-topmost", True)
         dialog.resizable(False, False)
         dialog.configure(bg=self.inner_color)
+        entry = {"window": dialog}
 
         # Hour selector
         tk.Label(dialog, text="Time:", bg=self.inner_color, fg=self.fg_color).grid(row=0, column=0, padx=5, pady=5, sticky="e")
-        hour_var = tk.StringVar(value=f"{self.alarm_hour:02d}")
-        hour_spin = tk.Spinbox(
-            dialog, from_=0, to=23, wrap=True, textvariable=hour_var,
+        entry["hour"] = tk.StringVar(dialog)
+        entry["hour_spin"] = tk.Spinbox(
+            dialog, from_=0, to=23, wrap=True, textvariable=entry["hour"],
             width=3, format="%02.0f", font=(self.font_name, 10)
         )
-        hour_spin.grid(row=0, column=1, padx=(0, 2), pady=5, sticky="w")
+        entry["hour_spin"].grid(row=0, column=1, padx=(0, 2), pady=5, sticky="w")
 
         # Separator
         tk.Label(dialog, text=":", bg=self.inner_color, fg=self.fg_color, font=(self.font_name, 12)).grid(row=0, column=2, pady=5)
 
         # Minute selector
-        minute_var = tk.StringVar(value=f"{self.alarm_minute:02d}")
-        minute_spin = tk.Spinbox(
-            dialog, from_=0, to=59, wrap=True, textvariable=minute_var,
+        entry["minute"] = tk.StringVar(dialog)
+        tk.Spinbox(
+            dialog, from_=0, to=59, wrap=True, textvariable=entry["minute"],
             width=3, format="%02.0f", font=(self.font_name, 10)
-        )
-        minute_spin.grid(row=0, column=3, padx=(2, 10), pady=5, sticky="w")
+        ).grid(row=0, column=3, padx=(2, 10), pady=5, sticky="w")
 
         # Message
         tk.Label(dialog, text="Message:", bg=self.inner_color, fg=self.fg_color).grid(row=1, column=0, padx=5, pady=5, sticky="e")
-        msg_var = tk.StringVar(value=self.alarm_message)
-        msg_entry = tk.Entry(dialog, width=30, textvariable=msg_var)
-        msg_entry.grid(row=1, column=1, columnspan=3, padx=5, pady=5)
+        entry["message"] = tk.StringVar(dialog)
+        tk.Entry(dialog, width=30, textvariable=entry["message"]).grid(row=1, column=1, columnspan=3, padx=5, pady=5)
+
+        # Repeat: once / daily / weekdays / every N minutes
+        tk.Label(dialog, text="Repeat:", bg=self.inner_color, fg=self.fg_color).grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        entry["repeat"] = tk.StringVar(dialog)
+        repeat_menu = tk.OptionMenu(dialog, entry["repeat"], *REPEAT_LABELS.values())
+        repeat_menu.configure(bg=self.inner_color, fg=self.fg_color, highlightthickness=0)
+        repeat_menu.grid(row=2, column=1, columnspan=2, padx=(0, 2), pady=5, sticky="w")
+        entry["interval"] = tk.StringVar(dialog)
+        tk.Spinbox(
+            dialog, from_=1, to=1440, textvariable=entry["interval"],
+            width=4, font=(self.font_name, 10)
+        ).grid(row=2, column=3, padx=(2, 10), pady=5, sticky="w")
 
         # Enabled checkbox
-        enabled_var = tk.BooleanVar(value=self.alarm_enabled)
-        enabled_cb = tk.Checkbutton(
+        entry["enabled"] = tk.BooleanVar(dialog)
+        tk.Checkbutton(
             dialog, text="Enable alarm",
-            variable=enabled_var,
+            variable=entry["enabled"],
             bg=self.inner_color,
             fg=self.fg_color,
             selectcolor=self.bg_color,
             activebackground=self.inner_color
-        )
-        enabled_cb.grid(row=2, column=0, columnspan=4, pady=5)
+        ).grid(row=3, column=0, columnspan=4, pady=5)
 
-        def save_and_close():
-            try:
-                h = int(hour_var.get())
-                m = int(minute_var.get())
-                if not (0 <= h <= 23 and 0 <= m <= 59):
-                    raise ValueError
-            except ValueError:
-                tk.messagebox.showerror("Error", "Hour: 00–23, Minute: 00–59", parent=dialog)
-                return
-            msg = msg_var.get().strip() or "Alarm!"
-            self.alarm_enabled = enabled_var.get()
-            self.alarm_hour = h
-            self.alarm_minute = m
-            self.alarm_message = msg
-            self.save_alarm_config()
-            dialog.destroy()
+        btn_frame = tk.Frame(dialog, bg=self.inner_color)
+        btn_frame.grid(row=4, column=0, columnspan=4, pady=10)
+        tk.Button(btn_frame, text="OK", command=self.save_alarm_dialog, width=8).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="Cancel", command=self.close_alarm_dialog, width=8).pack(side="left", padx=5)
 
-        def cancel():
-            dialog.destroy()
+        dialog.bind("<Return>", lambda e: self.save_alarm_dialog())
+        dialog.bind("<Escape>", lambda e: self.close_alarm_dialog())
+        dialog.protocol("WM_DELETE_WINDOW", self.close_alarm_dialog)
+        return entry
 
-        btn_frame = tk.Frame(dialog, bg=self.inner_color)
-        btn_frame.grid(row=3, column=0, columnspan=4, pady=10)
-        tk.Button(btn_frame, text="OK", command=save_and_close, width=8).pack(side="left", padx=5)
-        tk.Button(btn_frame, text="Cancel", command=cancel, width=8).pack(side="left", padx=5)
-
-        # ✅ Center dialog on screen
-        dialog.update_idletasks()
-        dw = dialog.winfo_reqwidth()
-        dh = dialog.winfo_reqheight()
-        sw = self.root.winfo_screenwidth()
-        sh = self.root.winfo_screenheight()
-        dx = (sw - dw) // 2
-        dy = (sh - dh) // 2
-        dialog.geometry(f"+{dx}+{dy}")
-
-        hour_spin.focus_set()
-        dialog.bind("<Return>", lambda e: save_and_close())
-        dialog.bind("<Escape>", lambda e: cancel())
-
-    def save_alarm_config(self):
-        config = self._read_config()
-        if "alarm" not in config:
-            config["alarm"] = {}
-        config["alarm"]["enabled"] = str(int(self.alarm_enabled))
-        config["alarm"]["hour"] = str(self.alarm_hour)
-        config["alarm"]["minute"] = str(self.alarm_minute)
-        config["alarm"]["message"] = self.alarm_message
-        self._write_config(config)
+    def show_alarm_dialog(self):
+        # ✅ Built once; reopening only refreshes the fields
+        entry = self.popups.get("alarm_dialog", self.build_alarm_dialog)
+        alarm = self.engine.primary_alarm()
+        entry["alarm"] = alarm
+        entry["hour"].set(f"{alarm.hour:02d}")
+        entry["minute"].set(f"{alarm.minute:02d}")
+        entry["message"].set(alarm.message)
+        entry["repeat"].set(REPEAT_LABELS[alarm.repeat])
+        entry["interval"].set(str(alarm.interval))
+        entry["enabled"].set(alarm.enabled)
+        self.place_popup(entry, center=True)
+        entry["hour_spin"].focus_set()
+
+    def save_alarm_dialog(self):
+        entry = self.popups.windows["alarm_dialog"]
+        try:
+            h = int(entry["hour"].get())
+            m = int(entry["minute"].get())
+            n = int(entry["interval"].get())
+            if not (0 <= h <= 23 and 0 <= m <= 59 and 1 <= n <= 1440):
+                raise ValueError
+        except ValueError:
+            from tkinter import messagebox  # normally already loaded by load_deferred()
+            messagebox.showerror("Error", "Hour: 00–23, Minute: 00–59, Every: 1–1440 min", parent=entry["window"])
+            return
+        now = self.engine.clock.now()
+        alarm = entry["alarm"]
+        alarm.message = entry["message"].get().strip().replace("\n", " ") or "Alarm!"
+        alarm.enabled = entry["enabled"].get()
+        alarm.hour = h
+        alarm.minute = m
+        alarm.interval = n
+        alarm.repeat = next(k for k, v in REPEAT_LABELS.items() if v == entry["repeat"].get())
+        alarm.at = alarm.next_time_of_day(now) if alarm.repeat == "once" else None
+        self.engine.set_alarm(alarm)
+        self.alarms_changed()
+        self.close_alarm_dialog()
+
+    def close_alarm_dialog(self):
+        self.popups.hide("alarm_dialog")
 
     # ——— Alarm trigger —————————————————————————————————————————————————————
-    def trigger_alarm(self):
-        # ✅ Play system sound Alarm03.wav, fallback to Beep
-        if os.path.isfile(sound_path):
-            winsound.PlaySound(sound_path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
-        else:
-            winsound.Beep(1000, 300)  # fallback
-
-        # Notification window
+    def trigger_alarm(self, alarm):
+        # Sound is already playing (engine); ✅ One notification window: simultaneous alarms are merged into it
+        self.alert_messages.append(alarm.message)
+        self.show_alert()
+        delay = None
+        if alarm.due_at is not None:
+            delay = max(0.0, self.engine.clock.time() - alarm.due_at.timestamp())
+            self.stats.alarm_delay.record(delay * 1000.0)
+        self.history.log("fire", self.engine.clock.now(), id=alarm.id, message=alarm.message,
+                         due=alarm.due_at.isoformat(timespec="seconds") if alarm.due_at else None,
+                         delay_s=round(delay, 1) if delay is not None else None)
+
+    def build_alert_window(self):
         alert = tk.Toplevel(self.root)
+        alert.withdraw()
         alert.overrideredirect(True)
         alert.attributes("-topmost", True)
         alert.attributes("-alpha", 0.95)
@@ -275,28 +2839,47 @@ class ClockOverlay:
         frame = tk.Frame(alert, bg=self.inner_color, padx=12, pady=8)
         frame.pack()
 
-        tk.Label(frame, text="⏰ Alarm!", font=(self.font_name, 14, "normal"), fg=self.fg_color, bg=self.inner_color).pack()
+        title = tk.Label(frame, text="⏰ Alarm!", font=(self.font_name, 14, "normal"), fg=self.fg_color, bg=self.inner_color)
+        title.pack()
         tk.Frame(frame, height=1, bg=self.fg_color).pack(fill="x", pady=(4, 6))
-        tk.Label(frame, text=self.alarm_message, font=(self.font_name, 12, "normal"), fg=self.fg_color, bg=self.inner_color,
-                 wraplength=250, justify="center").pack(pady=(0, 8))
-        ok_btn = tk.Button(frame, text="OK", command=alert.destroy, font=(self.font_name, 10),
+        message = tk.Label(frame, text="", font=(self.font_name, 12, "normal"), fg=self.fg_color, bg=self.inner_color,
+                           wraplength=250, justify="center")
+        message.pack(pady=(0, 8))
+        ok_btn = tk.Button(frame, text="OK", command=self.dismiss_alert, font=(self.font_name, 10),
                            bg=self.fg_color, fg=self.inner_color, relief="flat", padx=12, pady=4)
         ok_btn.pack()
 
-        # ✅ Auto height + anchor to bottom-right of clock (like About)
-        alert.update_idletasks()
-        w = alert.winfo_reqwidth()
-        h = alert.winfo_reqheight()
-        timer_x = self.root.winfo_x()
-        timer_y = self.root.winfo_y()
-        timer_w = self.outer_width
-        timer_h = self.outer_height
-        alert_x = timer_x + timer_w - w
-        alert_y = timer_y + timer_h - h
-        alert.geometry(f"{w}x{h}+{alert_x}+{alert_y}")
-
-        alert.bind("<Button-1>", lambda e: alert.destroy())
-        alert.bind("<Escape>", lambda e: alert.destroy())
+        alert.bind("<Button-1>", self.dismiss_alert)
+        alert.bind("<Escape>", self.dismiss_alert)
+        return {"window": alert, "title": title, "message": message}
+
+    def show_alert(self):
+        entry = self.popups.get("alert", self.build_alert_window)
+        counts = {}
+        for message in self.alert_messages:
+            counts[message] = counts.get(message, 0) + 1
+        lines = [f"{message} ×{n}" if n > 1 else message for message, n in counts.items()]
+        total = len(self.alert_messages)
+        entry["title"].configure(text="⏰ Alarm!" if total == 1 else f"⏰ {total} Alarms!")
+        entry["message"].configure(text="\n".join(lines[-ALERT_MAX_LINES:]))
+        self.place_popup(entry)
+
+    def dismiss_alert(self, event=None):
+        self.engine.audio.stop()
+        if self.alert_messages:
+            self.history.log("dismiss", self.engine.clock.now(), messages=list(dict.fromkeys(self.alert_messages)))
+        self.alert_messages = []
+        self.popups.hide("alert")
+
+    def snooze_alarm(self):
+        # ✅ Close the alarm popup and re-fire its alarms once in SNOOZE_MINUTES (not saved)
+        if self.alert_messages:
+            at = self.engine.snooze(self.alert_messages)
+            self.history.log("snooze", self.engine.clock.now(), messages=list(dict.fromkeys(self.alert_messages)),
+                             until=at.isoformat(timespec="minutes"))
+            self.alert_messages = []  # logged as a snooze, not a dismissal
+            self.alarms_changed()
+        self.dismiss_alert()
 
     # ——— Context menu —————————————————————————————————————————————————————
     def show_context_menu(self, event):
@@ -307,178 +2890,286 @@ class ClockOverlay:
 
     # ——— Lock / Unlock ————————————————————————————————————————————————
     def toggle_lock(self):
-        self.locked = not self.locked
-        self.update_lock_menu()
-        self.save_lock_state()
+        self.set_locked(not self.locked)
 
-    def update_lock_menu(self):
-        self.lock_menu.delete(0, "end")
-        if self.locked:
-            self.lock_menu.add_command(label="✓ Lock", command=self.toggle_lock)
-            self.lock_menu.add_command(label="  Unlock", command=self.toggle_lock)
-        else:
-            self.lock_menu.add_command(label="  Lock", command=self.toggle_lock)
-            self.lock_menu.add_command(label="✓ Unlock", command=self.toggle_lock)
+    def set_locked(self, locked):
+        self.locked = locked
+        self.lock_choices.select(locked)
+        self.save_lock_state()
 
     def save_lock_state(self):
-        config = self._read_config()
-        if "window" not in config:
-            config["window"] = {}
-        config["window"]["locked"] = str(int(self.locked))
-        self._write_config(config)
+        self.config.set("window", "locked", int(self.locked))
 
     # ——— Movement & auto-save —————————————————————————————————————————————
     def start_move(self, event):
         if self.locked:
             return
         self.dragging = True
-        self.start_x = event.x
-        self.start_y = event.y
+        self.drag.begin(event.x_root, event.y_root, self.outer_width, self.outer_height)
 
     def do_move(self, event):
         if not self.dragging or self.locked:
             return
-        x = self.root.winfo_x() + (event.x - self.start_x)
-        y = self.root.winfo_y() + (event.y - self.start_y)
-        self.set_position(x, y)
+        self.drag.motion(event.x_root, event.y_root)
 
     def on_move_release(self, event=None):
         if self.dragging:
             self.dragging = False
+            self.drag.end()
             self.save_position()
 
     def set_position(self, x, y):
-        self.root.geometry(f"+{int(x)}+{int(y)}")
+        self.drag.place(x, y)
 
     # ——— Config I/O ———————————————————————————————————————————————————————
-    def _read_config(self):
-        config = configparser.ConfigParser()
-        if os.path.exists(CONFIG_FILE):
-            try:
-                config.read(CONFIG_FILE, encoding="utf-8")
-            except Exception as e:
-                print(f"⚠️ Config read error: {e}")
-        return config
-
-    def _write_config(self, config):
-        try:
-            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                config.write(f)
-        except Exception as e:
-            print(f"⚠️ Config write error: {e}")
-
     def save_position(self):
-        x = self.root.winfo_x()
-        y = self.root.winfo_y()
-        config = self._read_config()
-        if "window" not in config:
-            config["window"] = {}
-        config["window"]["x"] = str(x)
-        config["window"]["y"] = str(y)
-        config["window"]["hotkey"] = self.hotkey
-        self._write_config(config)
+        self.config.set("window", "x", self.drag.x)
+        self.config.set("window", "y", self.drag.y)
 
     def _save_colors(self):
-        config = self._read_config()
-        if "window" not in config:
-            config["window"] = {}
-        config["window"]["bg_color"] = self.bg_color
-        config["window"]["inner_color"] = self.inner_color
-        config["window"]["fg_color"] = self.fg_color
-        config["window"]["hotkey"] = self.hotkey
-        self._write_config(config)
+        self.config.set("window", "bg_color", self.bg_color)
+        self.config.set("window", "inner_color", self.inner_color)
+        self.config.set("window", "fg_color", self.fg_color)
 
     def _save_alpha(self, alpha_percent):
-        config = self._read_config()
-        if "window" not in config:
-            config["window"] = {}
-        config["window"]["alpha"] = str(alpha_percent)
-        config["window"]["hotkey"] = self.hotkey
-        self._write_config(config)
+        self.config.set("window", "alpha", alpha_percent)
 
     def _save_font_size_only(self, size):
-        config = self._read_config()
-        if "window" not in config:
-            config["window"] = {}
-        config["window"]["font_size"] = str(size)
-        config["window"]["hotkey"] = self.hotkey
-        self._write_config(config)
-
-    def load_config(self):
-        config = self._read_config()
-        screen_width = self.root.winfo_screenwidth()
-        screen_height = self.root.winfo_screenheight()
-        x = screen_width - self.outer_width - 42
-        y = screen_height - self.outer_height - 260
-
-        font_size = 11
-        alpha_percent = 100
-        bg_color = self.default_bg
-        inner_color = self.default_inner
-        fg_color = self.default_fg
-        locked = False
-        hotkey = "F12"
-
-        # ✅ Load alarm defaults
-        alarm_enabled = False
-        alarm_hour = 12
-        alarm_minute = 0
-        alarm_msg = "Time to take a break!"
+        self.config.set("window", "font_size", size)
+
+    def read_settings(self):
+        # [window] values with defaults and clamping; used at startup and on hot reload
+        config = self.config
+        settings = {
+            "x": self.root.winfo_screenwidth() - self.outer_width - 42,
+            "y": self.root.winfo_screenheight() - self.outer_height - 260,
+            "font_size": 11,
+            "alpha": 100,
+            "bg_color": self.default_bg,
+            "inner_color": self.default_inner,
+            "fg_color": self.default_fg,
+            "locked": False,
+            "snap_edges": False,
+            "show_seconds": False,
+            "zones": "",
+            "hotkey": "F12",
+            "lock_hotkey": "",
+            "snooze_hotkey": "",
+            "stopwatch_hotkey": "",
+            "stopwatch_frame_ms": STOPWATCH_FRAME_MS,
+            "stats_port": 0,
+            "ntp_server": "",
+            "ntp_interval": NTP_INTERVAL,
+            "low_footprint": False,
+            "calendar": "",
+            "calendar_lead": CALENDAR_LEAD_MINUTES,
+        }
 
         if "window" in config:
-            x = config.getint("window", "x", fallback=x)
-            y = config.getint("window", "y", fallback=y)
-            font_size = max(10, min(20, config.getint("window", "font_size", fallback=font_size)))
-            alpha_percent = max(0, min(100, config.getint("window", "alpha", fallback=alpha_percent)))
-            bg_color = config.get("window", "bg_color", fallback=bg_color)
-            inner_color = config.get("window", "inner_color", fallback=inner_color)
-            fg_color = config.get("window", "fg_color", fallback=fg_color)
-            locked = bool(int(config.get("window", "locked", fallback="0")))
-            hotkey = config.get("window", "hotkey", fallback="F12").strip()
-
-        if "alarm" in config:
-            alarm_enabled = bool(int(config.get("alarm", "enabled", fallback="0")))
-            alarm_hour = config.getint("alarm", "hour", fallback=12)
-            alarm_minute = config.getint("alarm", "minute", fallback=0)
-            alarm_msg = config.get("alarm", "message", fallback="Time to take a break!").strip()
+            settings["x"] = config.getint("window", "x", fallback=settings["x"])
+            settings["y"] = config.getint("window", "y", fallback=settings["y"])
+            settings["font_size"] = max(10, min(20, config.getint("window", "font_size", fallback=11)))
+            settings["alpha"] = max(0, min(100, config.getint("window", "alpha", fallback=100)))
+            for key in ("bg_color", "inner_color", "fg_color"):
+                settings[key] = config.get("window", key, fallback=settings[key])
+            for key in ("locked", "snap_edges", "show_seconds", "low_footprint"):
+                try:
+                    settings[key] = bool(int(config.get("window", key, fallback="0")))
+                except ValueError:
+                    pass
+            settings["zones"] = config.get("window", "zones", fallback="").strip()
+            settings["hotkey"] = config.get("window", "hotkey", fallback="F12").strip()
+            settings["lock_hotkey"] = config.get("window", "lock_hotkey", fallback="").strip()
+            settings["snooze_hotkey"] = config.get("window", "snooze_hotkey", fallback="").strip()
+            settings["stopwatch_hotkey"] = config.get("window", "stopwatch_hotkey", fallback="").strip()
+            settings["stopwatch_frame_ms"] = max(16, min(1000, config.getint(
+                "window", "stopwatch_frame_ms", fallback=STOPWATCH_FRAME_MS)))
+            settings["stats_port"] = max(0, min(65535, config.getint("window", "stats_port", fallback=0)))
+            settings["ntp_server"] = config.get("window", "ntp_server", fallback="").strip()
+            settings["ntp_interval"] = max(60, min(86400, config.getint(
+                "window", "ntp_interval", fallback=NTP_INTERVAL)))
+            settings["calendar"] = config.get("window", "calendar", fallback="").strip()
+            settings["calendar_lead"] = max(0, min(1440, config.getint(
+                "window", "calendar_lead", fallback=CALENDAR_LEAD_MINUTES)))
+        return settings
+
+    def load_config(self):
+        # ✅ Every save only touches the in-memory copy (see ConfigStore)
+        settings = self.read_settings()
+        x, y = settings["x"], settings["y"]
+        font_size = settings["font_size"]
+        alpha_percent = settings["alpha"]
+        snap_edges = settings["snap_edges"]
 
         # Apply
-        self.bg_color = bg_color
-        self.inner_color = inner_color
-        self.fg_color = fg_color
-        self.locked = locked
+        self.bg_color = settings["bg_color"]
+        self.inner_color = settings["inner_color"]
+        self.fg_color = settings["fg_color"]
+        self.locked = settings["locked"]
+        self.drag.snap = snap_edges
         self.font_size = font_size
         self.alpha_percent = alpha_percent
-        self.hotkey = hotkey
-        self.alarm_enabled = alarm_enabled
-        self.alarm_hour = alarm_hour
-        self.alarm_minute = alarm_minute
-        self.alarm_message = alarm_msg
-
-        self.canvas.config(bg=self.bg_color)
-        self.canvas.itemconfig(self.rect_id, fill=self.inner_color)
-        self.canvas.itemconfig(self.text_id, fill=self.fg_color)
+        self.hotkey = settings["hotkey"]
+        self.lock_hotkey = settings["lock_hotkey"]
+        self.snooze_hotkey = settings["snooze_hotkey"]
+        self.stopwatch_hotkey = settings["stopwatch_hotkey"]
+        self.stopwatch_frame_ms = settings["stopwatch_frame_ms"]
+        self.stats_port = settings["stats_port"]
+        self.ntp_server = settings["ntp_server"]
+        self.ntp_interval = settings["ntp_interval"]
+        self.set_low_footprint(settings["low_footprint"])
+        self.engine.load_alarms(preload=self.hotkeys is not None)
+
+        self.apply_colors()
         self.set_position(x, y)
+        self.set_zones(settings["zones"])
+        self.engine.load_countdowns()
+        self.engine.set_calendar(settings["calendar"], settings["calendar_lead"])
+        self.rebuild_rows()
+        self.set_show_seconds(settings["show_seconds"])
         self.set_font_size(font_size)
         self.set_alpha(alpha_percent, save=False)
-        self.update_font_menu()
-        self.update_alpha_menu()
-        self.update_lock_menu()
+        self.lock_choices.select(self.locked)
 
-        # Save full config
+        # Save full config (one debounced flush, only if something changed)
+        self.config.set("window", "hotkey", self.hotkey)
+        self.config.set("window", "lock_hotkey", self.lock_hotkey)
+        self.config.set("window", "snooze_hotkey", self.snooze_hotkey)
+        self.config.set("window", "stopwatch_hotkey", self.stopwatch_hotkey)
         self._save_colors()
         self._save_font_size_only(font_size)
         self._save_alpha(alpha_percent)
-        self.save_position()
+        self.config.set("window", "x", int(x))
+        self.config.set("window", "y", int(y))
         self.save_lock_state()
-        self.save_alarm_config()
+        self.config.set("window", "snap_edges", int(snap_edges))
+
+    def apply_colors(self):
+        self.canvas.config(bg=self.bg_color)
+        self.canvas.itemconfig(self.rect_id, fill=self.inner_color)
+        for item in self.row_ids:
+            self.canvas.itemconfig(item, fill=self.fg_color)
+
+    # ——— Hot reload (config.ini edited while running) ————————————————————————
+    def start_config_watch(self):
+        # ✅ inotify where available; otherwise update_time() costs one stat per tick
+        self.config.listener = self.config_changed
+        self.config_watch = make_config_watch(CONFIG_FILE)
+        if self.config_watch is not None:
+            self.root.tk.createfilehandler(self.config_watch.fd, tk.READABLE, self.config_event)
+
+    def config_event(self, fd=None, mask=None):
+        if self.config_watch.read():
+            self.config.check()
+
+    def config_changed(self, changed):
+        # ✅ Diff-based: only settings whose keys changed are reapplied
+        window = {key for section, key in changed if section == "window"}
+        sections = {section for section, _ in changed}
+        settings = self.read_settings()
+        if window & {"x", "y"}:
+            self.set_position(settings["x"], settings["y"])
+        if window & {"bg_color", "inner_color", "fg_color"}:
+            self.bg_color = settings["bg_color"]
+            self.inner_color = settings["inner_color"]
+            self.fg_color = settings["fg_color"]
+            self.apply_colors()
+            self.popups.clear()  # pooled popups carry the old colors
+        if "font_size" in window:
+            self.set_font_size(settings["font_size"])
+        if "alpha" in window:
+            self.set_alpha(settings["alpha"], save=False)
+        if "locked" in window:
+            self.set_locked(settings["locked"])
+        if "snap_edges" in window:
+            self.drag.snap = settings["snap_edges"]
+        if "show_seconds" in window:
+            self.set_show_seconds(settings["show_seconds"])
+        if "zones" in window:
+            self.set_zones(settings["zones"])
+        if window & {"hotkey", "lock_hotkey", "snooze_hotkey", "stopwatch_hotkey"}:
+            self.hotkey = settings["hotkey"]
+            self.lock_hotkey = settings["lock_hotkey"]
+            self.snooze_hotkey = settings["snooze_hotkey"]
+            self.stopwatch_hotkey = settings["stopwatch_hotkey"]
+            self.setup_global_hotkey()
+        if "stopwatch_frame_ms" in window:
+            self.stopwatch_frame_ms = settings["stopwatch_frame_ms"]
+        if "low_footprint" in window:
+            self.set_low_footprint(settings["low_footprint"])
+        if window & {"ntp_server", "ntp_interval"}:
+            self.ntp_server = settings["ntp_server"]
+            self.ntp_interval = settings["ntp_interval"]
+            self.start_ntp()
+        if "stats_port" in window and settings["stats_port"] != self.stats_port:
+            self.stats_port = settings["stats_port"]
+            self.start_stats_server()  # 0 closes it
+        if sections & {"alarms", "alarm_sounds"}:
+            self.engine.reload_alarms()
+            self.alarms_changed()
+        if "countdowns" in sections:
+            self.engine.load_countdowns()
+            self.rebuild_rows()
+        if window & {"calendar", "calendar_lead"}:
+            self.engine.set_calendar(settings["calendar"], settings["calendar_lead"])
+            self.engine.check_calendar()
+            self.rebuild_rows()
+            self.alarms_changed()
+
+    # ——— Font, Alpha & Display ———————————————————————————————————————————
+    def layout(self):
+        # ✅ Sized from cached text widths: a font/format change is one geometry update, no re-measuring
+        metrics = self.text_metrics
+        linespace = metrics.linespace(self.font_size)
+        text_width = max(metrics.width(self.font_size, row.template(self.show_seconds)) for row in self.engine.rows)
+        width = text_width + 2 * WINDOW_PAD_X
+        height = len(self.row_ids) * linespace + 2 * WINDOW_PAD_Y
+        if (width, height) != (self.outer_width, self.outer_height):
+            self.outer_width = width
+            self.outer_height = height
+            self.canvas.config(width=width, height=height)
+            self.canvas.coords(
+                self.rect_id,
+                self.border_width, self.border_width,
+                width - self.border_width,
+                height - self.border_width
+            )
+        for i, item in enumerate(self.row_ids):
+            self.canvas.coords(item, width // 2, WINDOW_PAD_Y + i * linespace + linespace // 2)
+
+    def set_zones(self, zones):
+        self.engine.set_zones(zones)
+        self.rebuild_rows()
+
+    def rebuild_rows(self):
+        # One canvas text item per engine row; the first is text_id
+        for item in self.row_ids[1:]:
+            self.canvas.delete(item)
+        self.row_ids = self.row_ids[:1]
+        for _ in self.engine.rows[1:]:
+            self.row_ids.append(self.canvas.create_text(
+                0, 0, text="", font=(self.font_name, self.font_size, "normal"),
+                fill=self.fg_color, anchor="center"
+            ))
+        self.row_texts = [None] * len(self.row_ids)
+        self.layout()
+        self.ticker.resync_if_running()
+
+    def set_show_seconds(self, show_seconds):
+        self.show_seconds = show_seconds
+        self.engine.show_seconds = show_seconds
+        self.layout()
+        self.config.set("window", "show_seconds", int(show_seconds))
+        self.format_choices.select(show_seconds)
+        self.ticker.set_resolution(1 if show_seconds else 60)
 
-    # ——— Font & Alpha ————————————————————————————————————————————————
     def set_font_size(self, size):
         self.font_size = size
-        self.canvas.itemconfig(self.text_id, font=(self.font_name, size, "normal"))
+        for item in self.row_ids:
+            self.canvas.itemconfig(item, font=(self.font_name, size, "normal"))
+        self.layout()
         self._save_font_size_only(size)
-        self.update_font_menu()
+        self.font_choices.select(size)
 
     def set_alpha(self, alpha_percent, save=True):
         alpha = max(0, min(100, alpha_percent)) / 100.0
@@ -486,29 +3177,250 @@ class ClockOverlay:
         self.alpha_percent = alpha_percent
         if save:
             self._save_alpha(alpha_percent)
-        self.update_alpha_menu()
-
-    def update_font_menu(self):
-        self.font_menu.delete(0, "end")
-        for size in reversed(range(10, 21)):
-            label = f"{'✓ ' if size == self.font_size else '  '}{size}"
-            self.font_menu.add_command(
-                label=label,
-                command=lambda s=size: self.set_font_size(s)
-            )
+        self.alpha_choices.select(alpha_percent)
+        self.update_activity()
+
+    # ——— Stopwatch (own frame loop; the clock keeps its minute tick) ——————————
+    def show_stopwatch(self):
+        if not self.engine.stopwatch_shown:
+            self.engine.stopwatch_shown = True
+            self.rebuild_rows()
+
+    def hide_stopwatch(self):
+        self.engine.stopwatch.reset()
+        self.engine.stopwatch_shown = False
+        self.cancel_stopwatch()
+        self.rebuild_rows()
+
+    def toggle_stopwatch(self):
+        self.show_stopwatch()
+        self.engine.stopwatch.toggle()
+        self.stopwatch_frame()
+
+    def reset_stopwatch(self):
+        self.engine.stopwatch.reset(self.engine.stopwatch.duration)
+        if self.engine.stopwatch_shown:
+            self.stopwatch_frame()
+
+    def start_countdown(self, seconds):
+        self.show_stopwatch()
+        self.engine.stopwatch.reset(seconds)
+        self.engine.stopwatch.start()
+        self.stopwatch_frame()
+
+    def cancel_stopwatch(self):
+        if self.stopwatch_job is not None:
+            self.root.after_cancel(self.stopwatch_job)
+            self.stopwatch_job = None
+
+    def arm_stopwatch(self):
+        # Next frame at the next tenth, never sooner than the frame budget;
+        # hidden: only a countdown's end is waited for. Stopped: no frames at all.
+        self.cancel_stopwatch()
+        stopwatch = self.engine.stopwatch
+        if not (self.engine.stopwatch_shown and stopwatch.running):
+            return
+        if self.suspended:
+            if stopwatch.duration is None:
+                return
+            delay_ms = stopwatch.value() * 1000.0
+        else:
+            delay_ms = max(self.stopwatch_frame_ms, stopwatch.ms_to_change())
+        self.stopwatch_job = self.root.after(max(1, math.ceil(delay_ms)), self.stopwatch_frame)
 
-    def update_alpha_menu(self):
-        self.alpha_menu.delete(0, "end")
-        for alpha in reversed(range(0, 101, 5)):
-            label = f"{'✓ ' if alpha == self.alpha_percent else '  '}{alpha}%"
-            self.alpha_menu.add_command(
-                label=label,
-                command=lambda a=alpha: self.set_alpha(a)
-            )
+    def stopwatch_frame(self):
+        self.stopwatch_job = None
+        if not self.engine.stopwatch_shown:
+            return
+        started = time.perf_counter()
+        stopwatch = self.engine.stopwatch
+        done = stopwatch.check_finished()
+        i = len(self.row_ids) - 1  # the stopwatch is always the last row
+        text = stopwatch.text()
+        if text != self.row_texts[i]:
+            grew = self.row_texts[i] is not None and len(text) != len(self.row_texts[i])
+            self.canvas.itemconfig(self.row_ids[i], text=text)
+            self.row_texts[i] = text
+            if grew:
+                self.layout()  # H:MM:SS.t from the first hour on (cached width, no measure)
+        self.stats.render.record((time.perf_counter() - started) * 1000.0)
+        if done:
+            self.engine.audio.play()
+            self.alert_messages.append("⏱ Time is up")
+            self.show_alert()
+        self.arm_stopwatch()
+
+    # ——— NTP offset (optional: ntp_server in config.ini) ———————————————————————
+    def start_ntp(self):
+        # (Re)start the sync thread; the displayed time and alarms follow engine.clock.offset
+        if self.ntp is not None:
+            self.ntp.stop()
+            self.ntp = None
+        if not self.ntp_server:
+            stepped = abs(self.engine.clock.offset) > TIME_JUMP_THRESHOLD
+            self.engine.clock.offset = 0.0
+            if stepped:
+                self.clock_stepped()
+            return
+        try:
+            self.ntp = NtpSync(self.engine.clock, self.ntp_server, self.ntp_interval,
+                               on_step=partial(self.hotkeys.push, "clock_stepped"))
+        except ValueError as e:
+            print(f"⚠️ Bad ntp_server {self.ntp_server!r}: {e}")
+            return
+        self.ntp.start()
+
+    def clock_stepped(self):
+        # Tk thread: the corrected time moved by more than TIME_JUMP_THRESHOLD; redraw now
+        if self.suspended:
+            self.arm_alarm_wake()
+        else:
+            self.ticker.resync()
+
+    # ——— History (alarm_history.jsonl) ———————————————————————————————————
+    def build_history_window(self):
+        window = tk.Toplevel(self.root)
+        window.withdraw()
+        window.overrideredirect(True)
+        window.attributes("-topmost", True)
+        window.configure(bg=self.bg_color)
+        frame = tk.Frame(window, bg=self.inner_color, padx=10, pady=6)
+        frame.pack()
+        tk.Label(frame, text="Alarm history", font=(self.font_name, 14, "normal"),
+                 fg=self.fg_color, bg=self.inner_color).pack()
+        tk.Frame(frame, height=1, bg=self.fg_color).pack(fill="x", pady=(2, 4))
+        text = tk.Label(frame, text="", font=("Courier New", 10), fg=self.fg_color, bg=self.inner_color,
+                        justify="left")
+        text.pack()
+        window.bind("<Button-1>", lambda e: self.popups.hide("history"))
+        window.bind("<Escape>", lambda e: self.popups.hide("history"))
+        return {"window": window, "text": text}
+
+    def show_history(self):
+        entry = self.popups.get("history", self.build_history_window)
+        lines = []
+        for item in self.history.tail(HISTORY_VIEW_LINES):
+            when = item.get("t", "").replace("T", " ")
+            event = item.get("event", "?")
+            if event == "fire":
+                delay = item.get("delay_s")
+                detail = item.get("message", "") + (f" (+{delay:.0f} s)" if delay and delay >= 1 else "")
+            else:
+                detail = ", ".join(item.get("messages", []))
+                if event == "snooze":
+                    detail += f" → {item.get('until', '')[11:]}"
+            lines.append(f"{when}  {event:<7} {detail}")
+        entry["text"].configure(text="\n".join(lines) or "No alarms yet")
+        self.place_popup(entry)
+
+    # ——— Low-footprint mode —————————————————————————————————————————————————
+    def set_low_footprint(self, enabled):
+        # Popups are destroyed when closed instead of pooled; the next open rebuilds them
+        if enabled and not self.popups.release:
+            for kind in [k for k, entry in self.popups.windows.items() if not entry["window"].winfo_viewable()]:
+                self.popups.release = True
+                self.popups.hide(kind)
+        self.popups.release = enabled
+
+    # ——— Stats (tick lateness, render, alarm delay) ————————————————————————
+    def stats_extra(self):
+        return {
+            "ticks": self.ticker.ticks,
+            "jumps": self.ticker.jumps,
+            "wakeups_per_hour": {state: self.wakeups.per_hour(state) for state in ("shown", "hidden")},
+            "rss_bytes": rss_bytes(),
+            "popups_built": self.popups.builds,
+            "config_writes": self.config.writes,
+            "config_reloads": self.config.reloads,
+            "drag_geometry_calls": self.drag.geometry_calls,
+            "zone_offset_refreshes": sum(row.refreshes for row in self.engine.zone_rows),
+            "sound_loads": self.engine.audio.loads,
+            "text_measures": self.text_metrics.measures,
+            "history_written": self.history.written,
+            "calendar_imports": self.engine.calendar_file.imports if self.engine.calendar_file else 0,
+        }
+
+    def stats_json(self):
+        # Called on the stats-server thread: plain reads of numbers, no Tk
+        return self.stats.to_json(self.stats_extra())
+
+    def start_stats_server(self):
+        # ✅ Opt-in (stats_port in config.ini): `curl 127.0.0.1:<port>` dumps the histograms
+        # Also called on reload: a running server is closed and reopened on the new port
+        if self.stats_server is not None:
+            self.stats_server.close()
+            self.stats_server = None
+        if not self.stats_port:
+            return
+        try:
+            self.stats_server = StatsServer(self.stats_port, self.stats_json)
+            self.stats_server.start()
+        except OSError as e:
+            self.stats_server = None
+            print(f"⚠️ Stats server unavailable on port {self.stats_port}: {e}")
+
+    def build_stats_window(self):
+        window = tk.Toplevel(self.root)
+        window.withdraw()
+        window.overrideredirect(True)
+        window.attributes("-topmost", True)
+        window.configure(bg=self.bg_color)
+        frame = tk.Frame(window, bg=self.inner_color, padx=10, pady=6)
+        frame.pack()
+        tk.Label(frame, text="Stats", font=(self.font_name, 14, "normal"),
+                 fg=self.fg_color, bg=self.inner_color).pack()
+        tk.Frame(frame, height=1, bg=self.fg_color).pack(fill="x", pady=(2, 4))
+        text = tk.Label(frame, text="", font=("Courier New", 10), fg=self.fg_color, bg=self.inner_color,
+                        justify="left")
+        text.pack(pady=(0, 6))
+        btn_frame = tk.Frame(frame, bg=self.inner_color)
+        btn_frame.pack()
+        for label, command in (("Export", self.export_stats), ("Reset", self.reset_stats),
+                               ("Close", lambda: self.popups.hide("stats"))):
+            tk.Button(btn_frame, text=label, command=command, font=(self.font_name, 10), bg=self.fg_color,
+                      fg=self.inner_color, relief="flat", padx=8, pady=2).pack(side="left", padx=3)
+        window.bind("<Escape>", lambda e: self.popups.hide("stats"))
+        return {"window": window, "text": text}
+
+    def show_stats(self, note=""):
+        entry = self.popups.get("stats", self.build_stats_window)
+        lines = [self.stats.text(), f"Ticks: {self.ticker.ticks}, clock jumps: {self.ticker.jumps}"]
+        rss = rss_bytes()
+        if rss is not None:
+            lines.append(f"RSS: {rss / 2 ** 20:.1f} MB" + (" (low footprint)" if self.popups.release else ""))
+        # ✅ Only with --trace-memory: traced Python allocations by subsystem
+        for name, size, count in memory_report(8):
+            lines.append(f"  {name:<20}{size / 1024:8.1f} KB {count:7d} blocks")
+        lines.append(f"Config: {self.config.writes} writes, {self.config.reloads} reloads; "
+                     f"history entries: {self.history.written}")
+        lines.append(f"Drag geometry calls: {self.drag.geometry_calls}; zone offset refreshes: "
+                     f"{sum(row.refreshes for row in self.engine.zone_rows)}")
+        lines.append(f"Sounds decoded: {self.engine.audio.loads}; text measures: {self.text_metrics.measures}")
+        if self.engine.calendar_file is not None:
+            lines.append(f"Calendar imports: {self.engine.calendar_file.imports}")
+        if self.stats_server is not None:
+            lines.append(f"Serving on 127.0.0.1:{self.stats_server.port}")
+        if note:
+            lines.append(note)
+        entry["text"].configure(text="\n".join(lines))
+        self.place_popup(entry)
+
+    def export_stats(self):
+        try:
+            self.stats.export(STATS_FILE, self.stats_extra())
+            note = f"Saved to {os.path.abspath(STATS_FILE)}"
+        except OSError as e:
+            note = f"Export failed: {e}"
+        self.show_stats(note)
+
+    def reset_stats(self):
+        self.stats.reset()
+        self.show_stats()
 
     # ——— About window —————————————————————————————————————————————————————
-    def show_about(self):
+    def build_about_window(self):
         about = tk.Toplevel(self.root)
+        about.withdraw()
         about.overrideredirect(True)
         about.attributes("-topmost", True)
         about.configure(bg=self.bg_color)
@@ -525,70 +3437,135 @@ class ClockOverlay:
         title_label.pack()
         separator = tk.Frame(frame, height=1, bg=self.fg_color)
         separator.pack(fill="x", pady=(2, 4))
-        # ✅ Dynamic hotkey + VERSION constant
-        about_text = (
-            f"{self.hotkey} - show/hide window\n"
-            "By TeslaWizard (Europe)\n"
-            f"Ver. {VERSION}\n"
-            "©2025 Free"
-        )
         credit_label = tk.Label(
             frame,
-            text=about_text,
+            text="",
             font=(self.font_name, 14, "normal"),
             fg=self.fg_color,
             bg=self.inner_color,
             justify="center"
         )
         credit_label.pack()
-        about.update_idletasks()
-        w = about.winfo_reqwidth()
-        h = about.winfo_reqheight()
-        timer_x = self.root.winfo_x()
-        timer_y = self.root.winfo_y()
-        timer_w = self.outer_width
-        timer_h = self.outer_height
-        about_x = timer_x + timer_w - w
-        about_y = timer_y + timer_h - h
-        about.geometry(f"{w}x{h}+{about_x}+{about_y}")
-        about.bind("<Button-1>", lambda e: about.destroy())
-        about.bind("<Escape>", lambda e: about.destroy())
+        about.bind("<Button-1>", lambda e: self.popups.hide("about"))
+        about.bind("<Escape>", lambda e: self.popups.hide("about"))
+        return {"window": about, "text": credit_label}
+
+    def show_about(self):
+        entry = self.popups.get("about", self.build_about_window)
+        # ✅ Dynamic hotkey + VERSION constant
+        about_text = f"{self.hotkey} - show/hide window\n"
+        if self.lock_hotkey:
+            about_text += f"{self.lock_hotkey} - lock/unlock\n"
+        if self.snooze_hotkey:
+            about_text += f"{self.snooze_hotkey} - snooze alarm\n"
+        if self.stopwatch_hotkey:
+            about_text += f"{self.stopwatch_hotkey} - start/pause stopwatch\n"
+        if self.ntp is not None:
+            about_text += self.ntp.status() + "\n"
+        if self.engine.calendar_file is not None:
+            about_text += self.engine.calendar_file.status() + "\n"
+        about_text += (
+            f"Wakeups/h: {self.wakeups.per_hour('shown'):.0f} shown, "
+            f"{self.wakeups.per_hour('hidden'):.1f} hidden\n"
+            "By TeslaWizard (Europe)\n"
+            f"Ver. {VERSION}\n"
+            "©2025 Free"
+        )
+        entry["text"].configure(text=about_text)
+        self.place_popup(entry)
 
     # ——— Exit (robust) ———————————————————————————————————————————————————
     def exit_app(self):
-        if self.update_job:
-            try:
-                self.root.after_cancel(self.update_job)
-            except Exception:
-                pass
+        self.ticker.stop()
+        self.cancel_alarm_wake()
+        self.cancel_stopwatch()
+        if self.ntp is not None:
+            self.ntp.stop()
+        if self.hotkeys is not None:
+            self.hotkeys.close()
+        if self.stats_server is not None:
+            self.stats_server.close()
+        if self.command_server is not None:
+            self.command_server.close()
+        if self.config_watch is not None:
+            self.root.tk.deletefilehandler(self.config_watch.fd)
+            self.config_watch.close()
+        self.config.flush()
+        self.history.close()
+        if self.instance is not None:
+            self.instance.release()
         self.root.quit()
         self.root.after(50, self.root.destroy)
 
     # ——— Time update —————————————————————————————————————————————————————
-    def update_time(self):
-        now = datetime.now()
-        display_time = now.strftime("%H:%M")
-        self.canvas.itemconfig(self.text_id, text=display_time)
-
-        # ✅ FIXED: safe next-minute boundary (23:59→00:00 safe!)
-        next_min = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
-        delay_ms = int((next_min - now).total_seconds() * 1000)
-        delay_ms = max(50, min(60_000, delay_ms))
-
-        # ✅ Check alarm once per minute
-        if self.alarm_enabled and now.hour == self.alarm_hour and now.minute == self.alarm_minute:
-            self.trigger_alarm()
-            # Optional: auto-disable — uncomment to make one-time
-            # self.alarm_enabled = False
-            # self.save_alarm_config()
-
-        if self.update_job:
-            try:
-                self.root.after_cancel(self.update_job)
-            except Exception:
-                pass
-        self.update_job = self.root.after(delay_ms, self.update_time)
+    def update_time(self, now):
+        # Polled first: rows rebuilt by a reload are drawn by this tick, not the next boundary
+        if self.ready:
+            if self.config_watch is None:
+                self.config.check()  # polled hot reload: one stat per tick
+            self.engine.check_calendar()  # after load_deferred's first import
+        started = time.perf_counter()
+        texts, fired = self.engine.tick(now)
+        for i, text in enumerate(texts):
+            # ✅ Render on change only: no Tk call when the string is the same
+            if text != self.row_texts[i]:
+                self.canvas.itemconfig(self.row_ids[i], text=text)
+                self.row_texts[i] = text
+        self.stats.render.record((time.perf_counter() - started) * 1000.0)
+        row = self.engine.calendar_row
+        if self.engine.calendar_file is not None and row.prefix != self.calendar_prefix:
+            self.calendar_prefix = row.prefix
+            self.layout()  # the next event's name sets the row width
+        for alarm in fired:
+            self.trigger_alarm(alarm)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="time_overlay")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print a per-phase startup breakdown once the clock is up")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="trace Python allocations; Stats then lists memory by subsystem")
+    parser.add_argument("--toggle", action="store_true", help="show/hide the overlay")
+    lock_group = parser.add_mutually_exclusive_group()
+    lock_group.add_argument("--lock", action="store_true", help="lock the overlay in place")
+    lock_group.add_argument("--unlock", action="store_true", help="unlock the overlay")
+    parser.add_argument("--set-alarm", nargs=2, metavar=("HH:MM", "MESSAGE"),
+                        help="add a one-shot alarm at the next HH:MM")
+    args = parser.parse_args(argv)
+
+    commands = []
+    if args.toggle:
+        commands.append(["toggle"])
+    if args.lock or args.unlock:
+        commands.append(["set_lock", bool(args.lock)])
+    if args.set_alarm:
+        when, message = args.set_alarm
+        try:
+            hour, minute = (int(part) for part in when.split(":"))
+            if not (0 <= hour <= 23 and 0 <= minute <= 59):
+                raise ValueError
+        except ValueError:
+            parser.error(f"--set-alarm: bad time {when!r} (HH:MM)")
+        commands.append(["set_alarm", f"{hour:02d}:{minute:02d}", message])
+
+    # ✅ One overlay per config: a second launch forwards its commands and exits
+    lock = InstanceLock(INSTANCE_LOCK_FILE)
+    if not lock.acquire():
+        try:
+            reply = send_commands(lock, commands or [["show"]])
+        except (OSError, ValueError) as e:
+            sys.exit(f"⚠️ Time overlay is already running but not answering: {e}")
+        if reply != "ok":
+            sys.exit(f"⚠️ Time overlay: {reply}")
+        return
+    if args.trace_memory:
+        import tracemalloc
+        tracemalloc.start(8)
+    ClockOverlay(profile_startup=args.profile_startup, instance=lock if lock.file is not None else None,
+                 commands=commands).run()
 
 
 if __name__ == "__main__":
-    ClockOverlay()
+    main()